@@ -0,0 +1,45 @@
+"""Add trigram indexes for global search.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-01-01 00:00:02.000000
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003"
+down_revision: str = "002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (index name, table, column) for every column searched with ILIKE '%q%'
+TRIGRAM_INDEXES = (
+    ("ix_songs_title_trgm", "songs", "title"),
+    ("ix_songs_artist_trgm", "songs", "artist"),
+    ("ix_songs_album_trgm", "songs", "album"),
+    ("ix_playlists_name_trgm", "playlists", "name"),
+)
+
+
+def upgrade() -> None:
+    # GIN trigram indexes serve ILIKE '%q%' lookups, which btree cannot
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table)
+
+    # The extension is left installed; other objects may depend on it
@@ -0,0 +1,37 @@
+"""Add user_id to the listening history transitions index.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-01-01 00:00:03.000000
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: str = "003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Cover the "played together" aggregation (filters on user_id and
+    # previous_song_id, groups by song_id) with an index-only scan, keeping
+    # previous_song_id first for the ON DELETE SET NULL foreign key
+    op.drop_index("ix_listening_history_transitions", table_name="listening_history")
+    op.create_index(
+        "ix_listening_history_transitions",
+        "listening_history",
+        ["previous_song_id", "user_id", "song_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listening_history_transitions", table_name="listening_history")
+    op.create_index(
+        "ix_listening_history_transitions",
+        "listening_history",
+        ["previous_song_id", "song_id"],
+    )
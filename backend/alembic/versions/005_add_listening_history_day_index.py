@@ -0,0 +1,32 @@
+"""Index listening history by user and UTC day.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-01-01 00:00:04.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: str = "004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Serves the daily listening histogram, which filters and groups on the
+    # UTC day; timezone('UTC', ...) keeps the expression immutable
+    op.create_index(
+        "ix_listening_history_user_day",
+        "listening_history",
+        ["user_id", sa.text("date_trunc('day', timezone('UTC', played_at))")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listening_history_user_day", table_name="listening_history")
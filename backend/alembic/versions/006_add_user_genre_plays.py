@@ -0,0 +1,55 @@
+"""Add per-user genre play counts.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-01-01 00:00:05.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: str = "005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_genre_plays",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("genre", sa.String(100), primary_key=True),
+        sa.Column("play_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ix_user_genre_plays_user_count",
+        "user_genre_plays",
+        ["user_id", "play_count"],
+    )
+
+    # Backfill from the plays recorded so far
+    op.execute(
+        """
+        INSERT INTO user_genre_plays (user_id, genre, play_count)
+        SELECT lh.user_id, s.genre, count(*)
+        FROM listening_history lh
+        JOIN songs s ON s.id = lh.song_id
+        WHERE s.genre IS NOT NULL
+        GROUP BY lh.user_id, s.genre
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_genre_plays_user_count", table_name="user_genre_plays")
+    op.drop_table("user_genre_plays")
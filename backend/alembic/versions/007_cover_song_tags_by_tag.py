@@ -0,0 +1,28 @@
+"""Add song_id to the song tags by tag index.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-01-01 00:00:06.000000
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: str = "006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Let songs-by-tag count and page from the index alone; the reverse
+    # direction is already covered by uq_song_tag (song_id, tag_id)
+    op.drop_index("ix_song_tags_tag", table_name="song_tags")
+    op.create_index("ix_song_tags_tag", "song_tags", ["tag_id", "song_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_song_tags_tag", table_name="song_tags")
+    op.create_index("ix_song_tags_tag", "song_tags", ["tag_id"])
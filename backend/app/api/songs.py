@@ -14,7 +14,7 @@ from fastapi import (
     UploadFile,
     status,
 )
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import CurrentUser
@@ -413,10 +413,8 @@ async def stream_song(
                 end = min(end, file_size - 1)
                 content_length = end - start + 1
 
-                content = await storage.read_file_range(song.file_path, start, end + 1)
-
-                return Response(
-                    content=content,
+                return StreamingResponse(
+                    storage.iter_file_range(song.file_path, start, end + 1),
                     status_code=status.HTTP_206_PARTIAL_CONTENT,
                     headers={
                         "Content-Type": content_type,
@@ -427,9 +425,8 @@ async def stream_song(
                 )
 
         # Full file response
-        content = await storage.read_file(song.file_path)
-        return Response(
-            content=content,
+        return StreamingResponse(
+            storage.iter_file_range(song.file_path, 0),
             status_code=status.HTTP_200_OK,
             headers={
                 "Content-Type": content_type,
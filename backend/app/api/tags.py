@@ -3,7 +3,7 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import CurrentUser
@@ -11,6 +11,7 @@ from app.db.session import get_db
 from app.models.song import Song
 from app.schemas.tag import (
     SongTagRequest,
+    SongTagsRequest,
     SongWithTagsResponse,
     TagCreate,
     TagListResponse,
@@ -287,3 +288,92 @@ async def remove_tag_from_song(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={"code": "TAG_NOT_ON_SONG", "message": str(e)},
         ) from e
+
+
+@song_tags_router.post(
+    "/{song_id}/tags/batch",
+    response_model=SongWithTagsResponse,
+    summary="Add tags to song",
+    description="Add several tags to a song. Tags already on the song are skipped.",
+)
+async def add_tags_to_song(
+    song_id: UUID,
+    data: SongTagsRequest,
+    current_user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> SongWithTagsResponse:
+    """Add several tags to a song.
+
+    Args:
+        song_id: Song UUID.
+        data: Tags request data.
+        current_user: Current authenticated user.
+        db: Database session.
+
+    Returns:
+        Updated song with tags.
+
+    Raises:
+        HTTPException: If song or any of the tags not found.
+    """
+    tag_service = TagService(db)
+
+    try:
+        song = await tag_service.add_tags_to_song(
+            song_id=song_id,
+            tag_ids=data.tag_ids,
+            owner_id=current_user.id,
+        )
+        return _convert_song_with_tags(song)
+    except SongNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"code": "SONG_NOT_FOUND", "message": str(e)},
+        ) from e
+    except TagNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"code": "TAG_NOT_FOUND", "message": str(e)},
+        ) from e
+
+
+@song_tags_router.delete(
+    "/{song_id}/tags",
+    response_model=SongWithTagsResponse,
+    summary="Remove tags from song",
+    description="Remove several tags from a song. Tags not on the song are ignored.",
+)
+async def remove_tags_from_song(
+    song_id: UUID,
+    tag_ids: Annotated[list[UUID], Query(min_length=1, max_length=100)],
+    current_user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> SongWithTagsResponse:
+    """Remove several tags from a song.
+
+    Args:
+        song_id: Song UUID.
+        tag_ids: Tag UUIDs.
+        current_user: Current authenticated user.
+        db: Database session.
+
+    Returns:
+        Updated song with tags.
+
+    Raises:
+        HTTPException: If song not found.
+    """
+    tag_service = TagService(db)
+
+    try:
+        song = await tag_service.remove_tags_from_song(
+            song_id=song_id,
+            tag_ids=tag_ids,
+            owner_id=current_user.id,
+        )
+        return _convert_song_with_tags(song)
+    except SongNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"code": "SONG_NOT_FOUND", "message": str(e)},
+        ) from e
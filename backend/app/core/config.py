@@ -27,6 +27,15 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "nicemusiclib"
     POSTGRES_DB: str = "nicemusiclib"
 
+    # Connection pool, per worker process. The defaults keep 4 workers within
+    # PostgreSQL's default max_connections of 100. Set DB_NULL_POOL when
+    # connecting through PgBouncer in transaction mode, which already pools.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 5
+    DB_POOL_RECYCLE_SECONDS: int = 3600
+    DB_NULL_POOL: bool = False
+
     # Redis
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
@@ -35,6 +44,9 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Password hashing; bcrypt cost factor, lowered only in tests
+    BCRYPT_ROUNDS: int = 12
+
     # File storage
     UPLOAD_DIR: str = "/app/uploads"
     MAX_UPLOAD_SIZE_MB: int = 100
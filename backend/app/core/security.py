@@ -3,17 +3,24 @@
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
 # Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
 
 # JWT settings
 ALGORITHM = "HS256"
 
+# Signing key prepared once instead of on every encode and decode
+_signing_key = jwk.construct(settings.SECRET_KEY, ALGORITHM)
+
 
 def create_access_token(subject: str, expires_delta: timedelta | None = None) -> str:
     """Create a new access token.
@@ -37,7 +44,7 @@ def create_access_token(subject: str, expires_delta: timedelta | None = None) ->
         "exp": expire,
         "type": "access",
     }
-    encoded_jwt: str = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt: str = jwt.encode(to_encode, _signing_key, algorithm=ALGORITHM)
     return encoded_jwt
 
 
@@ -61,7 +68,7 @@ def create_refresh_token(subject: str, expires_delta: timedelta | None = None) -
         "exp": expire,
         "type": "refresh",
     }
-    encoded_jwt: str = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt: str = jwt.encode(to_encode, _signing_key, algorithm=ALGORITHM)
     return encoded_jwt
 
 
@@ -76,7 +83,7 @@ def decode_token(token: str) -> dict[str, Any] | None:
     """
     try:
         payload: dict[str, Any] = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[ALGORITHM]
+            token, _signing_key, algorithms=[ALGORITHM]
         )
         return payload
     except JWTError:
@@ -1,5 +1,8 @@
 """SQLAlchemy base model."""
 
+from typing import Any
+
+from sqlalchemy import Connection, MetaData, event, text
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -7,3 +10,13 @@ class Base(DeclarativeBase):
     """Base class for SQLAlchemy models."""
 
     pass
+
+
+@event.listens_for(Base.metadata, "before_create")
+def _create_extensions(target: MetaData, connection: Connection, **kw: Any) -> None:
+    """Install the extensions the models' indexes depend on.
+
+    Migration 003 installs pg_trgm for deployed databases; this covers schemas
+    built with ``metadata.create_all``, such as the test database.
+    """
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
@@ -3,16 +3,28 @@
 from collections.abc import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 
-# Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+# Create async engine; a short pool timeout fails requests fast under
+# overload instead of queueing them behind long stats queries
+engine = (
+    create_async_engine(
+        settings.database_url,
+        echo=settings.DEBUG,
+        poolclass=NullPool,
+    )
+    if settings.DB_NULL_POOL
+    else create_async_engine(
+        settings.database_url,
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
 )
 
 # Create async session factory
@@ -1,6 +1,6 @@
 """SQLAlchemy models."""
 
-from app.models.listening_history import ListeningHistory
+from app.models.listening_history import ListeningHistory, UserGenrePlays
 from app.models.mood_chain import MoodChain, MoodChainSong, MoodChainTransition
 from app.models.playlist import Playlist, PlaylistSong
 from app.models.song import Song
@@ -16,6 +16,7 @@ __all__ = [
     "MoodChainSong",
     "MoodChainTransition",
     "ListeningHistory",
+    "UserGenrePlays",
     "Tag",
     "SongTag",
 ]
@@ -13,6 +13,7 @@ from sqlalchemy import (
     Index,
     Integer,
     String,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -87,6 +88,11 @@ class ListeningHistory(Base, UUIDMixin):
 
     __table_args__ = (
         Index("ix_listening_history_user_played", "user_id", "played_at"),
+        Index(
+            "ix_listening_history_user_day",
+            "user_id",
+            text("date_trunc('day', timezone('UTC', played_at))"),
+        ),
         Index("ix_listening_history_user_song", "user_id", "song_id"),
         Index("ix_listening_history_song_played", "song_id", "played_at"),
         Index(
@@ -98,6 +104,25 @@ class ListeningHistory(Base, UUIDMixin):
         Index(
             "ix_listening_history_transitions",
             "previous_song_id",
+            "user_id",
             "song_id",
         ),
     )
+
+
+class UserGenrePlays(Base):
+    """Per-user play counts by genre, maintained as plays are recorded."""
+
+    __tablename__ = "user_genre_plays"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    genre: Mapped[str] = mapped_column(String(100), primary_key=True)
+    play_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default=text("0"), nullable=False
+    )
+
+    __table_args__ = (Index("ix_user_genre_plays_user_count", "user_id", "play_count"),)
@@ -54,7 +54,16 @@ class Playlist(Base, UUIDMixin, TimestampMixin):
         order_by="PlaylistSong.position",
     )
 
-    __table_args__ = (Index("ix_playlists_owner_name", "owner_id", "name"),)
+    __table_args__ = (
+        Index("ix_playlists_owner_name", "owner_id", "name"),
+        # Trigram index for global search (ILIKE '%q%'); see migration 003
+        Index(
+            "ix_playlists_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
 
 class PlaylistSong(Base, UUIDMixin):
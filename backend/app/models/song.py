@@ -94,10 +94,15 @@ class Song(Base, UUIDMixin, TimestampMixin):
         cascade="all, delete-orphan",
         foreign_keys="ListeningHistory.song_id",
     )
+    # Loaded explicitly with selectinload; a join across the association
+    # would repeat the song row for every tag. Rows are removed with the song
+    # by ON DELETE CASCADE
     song_tags: Mapped[list["SongTag"]] = relationship(
         "SongTag",
         back_populates="song",
         cascade="all, delete-orphan",
+        lazy="raise",
+        passive_deletes=True,
     )
 
     __table_args__ = (
@@ -107,4 +112,23 @@ class Song(Base, UUIDMixin, TimestampMixin):
         Index("ix_songs_owner_play_count", "owner_id", "play_count"),
         Index("ix_songs_owner_last_played", "owner_id", "last_played_at"),
         Index("ix_songs_owner_favorite", "owner_id", "is_favorite"),
+        # Trigram indexes for global search (ILIKE '%q%'); see migration 003
+        Index(
+            "ix_songs_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_songs_artist_trgm",
+            "artist",
+            postgresql_using="gin",
+            postgresql_ops={"artist": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_songs_album_trgm",
+            "album",
+            postgresql_using="gin",
+            postgresql_ops={"album": "gin_trgm_ops"},
+        ),
     )
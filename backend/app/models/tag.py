@@ -70,5 +70,6 @@ class SongTag(Base, UUIDMixin):
 
     __table_args__ = (
         UniqueConstraint("song_id", "tag_id", name="uq_song_tag"),
-        Index("ix_song_tags_tag", "tag_id"),
+        # Songs by tag: serves the tag_id filter and the join to songs
+        Index("ix_song_tags_tag", "tag_id", "song_id"),
     )
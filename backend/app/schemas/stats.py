@@ -1,10 +1,10 @@
 """Statistics schemas for request/response validation."""
 
-from datetime import datetime
+from datetime import UTC, datetime
 from enum import Enum
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from app.schemas.song import SongResponse
 
@@ -43,6 +43,20 @@ class PlayRecordRequest(BaseModel):
     device_type: str | None = Field(default=None, max_length=50)
 
 
+class PlayImportItem(PlayRecordRequest):
+    """Schema for a past play event imported in bulk."""
+
+    played_at: datetime
+
+    @field_validator("played_at")
+    @classmethod
+    def validate_played_at(cls, v: datetime) -> datetime:
+        """Treat naive timestamps as UTC so a batch never mixes both kinds."""
+        if v.tzinfo is None:
+            return v.replace(tzinfo=UTC)
+        return v
+
+
 class HistoryFilters(BaseModel):
     """Schema for history filtering parameters."""
 
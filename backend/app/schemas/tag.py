@@ -72,6 +72,12 @@ class SongTagRequest(BaseModel):
     tag_id: UUID
 
 
+class SongTagsRequest(BaseModel):
+    """Schema for adding several tags to a song."""
+
+    tag_ids: list[UUID] = Field(min_length=1, max_length=100)
+
+
 class SongWithTagsResponse(BaseModel):
     """Schema for song response with tags."""
 
@@ -1,15 +1,162 @@
 """Redis cache service for statistics caching."""
 
-import json
+import fnmatch
 import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime
 from typing import Any
+from uuid import UUID
 
+import orjson
 import redis.asyncio as redis
+from sqlalchemy import Row
 
 from app.core.config import settings
+from app.models.song import Song
 
 logger = logging.getLogger(__name__)
 
+# Keys requested per SCAN step and unlinked per round trip in delete_pattern
+DELETE_PATTERN_BATCH_SIZE = 500
+
+# Song fields stored in cached payloads, besides id and timestamps
+CACHED_SONG_FIELDS = (
+    "title",
+    "artist",
+    "album",
+    "genre",
+    "year",
+    "duration_seconds",
+    "file_format",
+    "play_count",
+    "is_favorite",
+    "rating",
+    "cover_art_path",
+    "bpm",
+    "energy",
+    "valence",
+)
+
+
+def _dumps(value: Any) -> bytes:
+    """Serialize a cache payload.
+
+    orjson encodes UUIDs and datetimes natively; anything else it does not
+    know is stored as its string form.
+
+    Args:
+        value: Value to serialize.
+
+    Returns:
+        JSON document as bytes.
+    """
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def song_to_cache(song: Song | Row[*tuple[Any, ...]]) -> dict[str, Any]:
+    """Serialize a song into a JSON-friendly cache payload.
+
+    Args:
+        song: Song, or a row selecting its id, timestamps and cached fields.
+
+    Returns:
+        Dictionary with the fields needed to render the song.
+    """
+    data = {field: getattr(song, field) for field in CACHED_SONG_FIELDS}
+    data["id"] = str(song.id)
+    data["created_at"] = song.created_at.isoformat()
+    data["last_played_at"] = (
+        song.last_played_at.isoformat() if song.last_played_at else None
+    )
+    return data
+
+
+def song_from_cache(data: dict[str, Any]) -> Song:
+    """Rebuild a detached song from a cache payload.
+
+    Args:
+        data: Dictionary produced by song_to_cache.
+
+    Returns:
+        Transient Song instance, not attached to any session.
+    """
+    last_played_at = data["last_played_at"]
+    return Song(
+        id=UUID(data["id"]),
+        created_at=datetime.fromisoformat(data["created_at"]),
+        last_played_at=datetime.fromisoformat(last_played_at)
+        if last_played_at
+        else None,
+        **{field: data[field] for field in CACHED_SONG_FIELDS},
+    )
+
+
+class LocalTTLCache:
+    """Small in-process LRU cache with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        """Initialize local cache.
+
+        Args:
+            maxsize: Maximum number of entries before the least recently
+                used ones are evicted.
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        """Get a value if present and not expired.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Cached value or None if not found.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        """Store a value.
+
+        Args:
+            key: Cache key.
+            value: Value to cache.
+            ttl_seconds: Time to live in seconds.
+        """
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Delete a value.
+
+        Args:
+            key: Cache key.
+        """
+        self._entries.pop(key, None)
+
+    def delete_pattern(self, pattern: str) -> None:
+        """Delete all keys matching a glob-style pattern.
+
+        Args:
+            pattern: Key pattern (e.g., "stats:user:*").
+        """
+        for key in [k for k in self._entries if fnmatch.fnmatchcase(k, pattern)]:
+            del self._entries[key]
+
 
 class CacheService:
     """Service for caching data in Redis."""
@@ -17,14 +164,18 @@ class CacheService:
     def __init__(
         self,
         redis_client: redis.Redis | None = None,  # type: ignore[type-arg]
+        local_cache: LocalTTLCache | None = None,
     ) -> None:
         """Initialize cache service.
 
         Args:
             redis_client: Redis client instance. If None, creates a new one.
+            local_cache: In-process cache for keys read or written with a
+                local TTL. If None, creates a new one.
         """
         self._client: redis.Redis | None = redis_client  # type: ignore[type-arg]
         self._connected = False
+        self._local = local_cache or LocalTTLCache()
 
     async def _get_client(self) -> redis.Redis | None:  # type: ignore[type-arg]
         """Get or create Redis client.
@@ -50,33 +201,84 @@ class CacheService:
             self._connected = False
             return None
 
-    async def get(self, key: str) -> Any | None:
+    async def get(
+        self,
+        key: str,
+        local_ttl_seconds: int | None = None,
+    ) -> Any | None:
         """Get value from cache.
 
         Args:
             key: Cache key.
+            local_ttl_seconds: If set, values found in Redis are also kept in
+                the in-process cache for this many seconds.
 
         Returns:
             Cached value or None if not found.
         """
+        value = self._local.get(key)
+        if value is not None:
+            return value
+
         client = await self._get_client()
         if client is None:
             return None
 
         try:
-            value = await client.get(key)
-            if value is not None:
-                return json.loads(value)
-            return None
+            raw = await client.get(key)
+            if raw is None:
+                return None
+            value = orjson.loads(raw)
+            if local_ttl_seconds:
+                self._local.set(key, value, local_ttl_seconds)
+            return value
         except Exception as e:
             logger.warning(f"Failed to get from cache: {e}")
             return None
 
+    async def get_many(
+        self,
+        keys: list[str],
+        local_ttl_seconds: int | None = None,
+    ) -> list[Any | None]:
+        """Get several values from cache in one round trip.
+
+        Args:
+            keys: Cache keys.
+            local_ttl_seconds: If set, values found in Redis are also kept in
+                the in-process cache for this many seconds.
+
+        Returns:
+            Cached values in key order, None for keys not found.
+        """
+        values = [self._local.get(key) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        if not missing:
+            return values
+
+        client = await self._get_client()
+        if client is None:
+            return values
+
+        try:
+            raw_values = await client.mget([keys[i] for i in missing])
+            for i, raw in zip(missing, raw_values, strict=True):
+                if raw is None:
+                    continue
+                values[i] = orjson.loads(raw)
+                if local_ttl_seconds:
+                    self._local.set(keys[i], values[i], local_ttl_seconds)
+            return values
+        except Exception as e:
+            logger.warning(f"Failed to get many from cache: {e}")
+            return values
+
     async def set(
         self,
         key: str,
         value: Any,
         ttl_seconds: int = 300,
+        local_ttl_seconds: int | None = None,
     ) -> bool:
         """Set value in cache.
 
@@ -84,22 +286,163 @@ class CacheService:
             key: Cache key.
             value: Value to cache (must be JSON serializable).
             ttl_seconds: Time to live in seconds. Default 5 minutes.
+            local_ttl_seconds: If set, the value is also kept in the
+                in-process cache for this many seconds. Keep it well below
+                ttl_seconds: other processes only see deletions through Redis.
 
         Returns:
             True if successful, False otherwise.
         """
+        if local_ttl_seconds:
+            self._local.set(key, value, min(local_ttl_seconds, ttl_seconds))
+
         client = await self._get_client()
         if client is None:
             return False
 
         try:
-            serialized = json.dumps(value, default=str)
+            serialized = _dumps(value)
             await client.setex(key, ttl_seconds, serialized)
             return True
         except Exception as e:
             logger.warning(f"Failed to set cache: {e}")
             return False
 
+    async def hget(self, name: str, field: str) -> Any | None:
+        """Get a field of a cached hash.
+
+        Args:
+            name: Hash key.
+            field: Field within the hash.
+
+        Returns:
+            Cached value or None if not found or expired.
+        """
+        client = await self._get_client()
+        if client is None:
+            return None
+
+        try:
+            raw = await client.hget(name, field)
+            if raw is None:
+                return None
+            entry = orjson.loads(raw)
+            if entry["expires_at"] <= time.time():
+                return None
+            return entry["value"]
+        except Exception as e:
+            logger.warning(f"Failed to get hash field from cache: {e}")
+            return None
+
+    async def hset(
+        self,
+        name: str,
+        field: str,
+        value: Any,
+        ttl_seconds: int = 300,
+    ) -> bool:
+        """Set a field of a cached hash.
+
+        Redis only expires whole hashes, so each field carries its own expiry
+        and the hash TTL is only ever extended to cover the longest-lived field.
+        Grouping related keys in one hash lets delete() drop them all at once.
+
+        Args:
+            name: Hash key.
+            field: Field within the hash.
+            value: Value to cache (must be JSON serializable).
+            ttl_seconds: Time to live in seconds. Default 5 minutes.
+
+        Returns:
+            True if successful, False otherwise.
+        """
+        client = await self._get_client()
+        if client is None:
+            return False
+
+        try:
+            serialized = _dumps(
+                {"value": value, "expires_at": time.time() + ttl_seconds}
+            )
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.hset(name, field, serialized)
+                pipe.expire(name, ttl_seconds, nx=True)
+                pipe.expire(name, ttl_seconds, gt=True)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to set hash field in cache: {e}")
+            return False
+
+    async def get_or_set_swr(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        ttl_seconds: int,
+        stale_ttl_seconds: int,
+        field: str | None = None,
+    ) -> Any:
+        """Get a value with stale-while-revalidate semantics.
+
+        Values are fresh for ttl_seconds and may then be served stale for
+        another stale_ttl_seconds. The first caller to see a stale value
+        takes a short Redis lock and recomputes it; concurrent callers keep
+        getting the stale value instead of all hitting the database.
+
+        Args:
+            key: Cache key.
+            factory: Coroutine function computing a JSON serializable value.
+            ttl_seconds: How long a computed value is fresh.
+            stale_ttl_seconds: How long a value may be served once stale.
+            field: If set, the value is stored in this field of the hash at
+                key instead of in key itself.
+
+        Returns:
+            Cached or freshly computed value.
+        """
+        if field is None:
+            entry = await self.get(key)
+            lock_key = key
+        else:
+            entry = await self.hget(key, field)
+            lock_key = f"{key}:{field}"
+
+        if entry is not None:
+            if entry["fresh_until"] > time.time():
+                return entry["value"]
+            if not await self._acquire_refresh_lock(lock_key, stale_ttl_seconds):
+                return entry["value"]
+
+        value = await factory()
+        entry = {"value": value, "fresh_until": time.time() + ttl_seconds}
+        if field is None:
+            await self.set(key, entry, ttl_seconds + stale_ttl_seconds)
+        else:
+            await self.hset(key, field, entry, ttl_seconds + stale_ttl_seconds)
+        return value
+
+    async def _acquire_refresh_lock(self, key: str, ttl_seconds: int) -> bool:
+        """Try to become the caller refreshing a stale key.
+
+        Args:
+            key: Cache key being refreshed.
+            ttl_seconds: Lock expiry, in case the refresh fails.
+
+        Returns:
+            True if the caller should refresh, False if another one is.
+        """
+        client = await self._get_client()
+        if client is None:
+            return True
+
+        try:
+            return bool(
+                await client.set(f"{key}:refresh", "1", nx=True, ex=ttl_seconds)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to acquire cache refresh lock: {e}")
+            return True
+
     async def delete(self, key: str) -> bool:
         """Delete value from cache.
 
@@ -109,6 +452,8 @@ class CacheService:
         Returns:
             True if successful, False otherwise.
         """
+        self._local.delete(key)
+
         client = await self._get_client()
         if client is None:
             return False
@@ -129,16 +474,25 @@ class CacheService:
         Returns:
             True if successful, False otherwise.
         """
+        self._local.delete_pattern(pattern)
+
         client = await self._get_client()
         if client is None:
             return False
 
         try:
-            keys = []
-            async for key in client.scan_iter(match=pattern):
-                keys.append(key)
-            if keys:
-                await client.delete(*keys)
+            # UNLINK frees memory off the Redis main thread; batching bounds
+            # both the command size and the number of round trips
+            batch: list[str] = []
+            async for key in client.scan_iter(
+                match=pattern, count=DELETE_PATTERN_BATCH_SIZE
+            ):
+                batch.append(key)
+                if len(batch) >= DELETE_PATTERN_BATCH_SIZE:
+                    await client.unlink(*batch)
+                    batch.clear()
+            if batch:
+                await client.unlink(*batch)
             return True
         except Exception as e:
             logger.warning(f"Failed to delete pattern from cache: {e}")
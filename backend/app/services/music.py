@@ -9,7 +9,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.song import Song
 from app.schemas.song import SongFilters, SongUpdate
+from app.services.cache import CacheService, get_cache_service
 from app.services.metadata import MetadataExtractor
+from app.services.stats import move_genre_plays
 from app.services.storage import StorageService
 
 
@@ -33,6 +35,7 @@ class MusicService:
         db: AsyncSession,
         storage: StorageService | None = None,
         metadata_extractor: MetadataExtractor | None = None,
+        cache: CacheService | None = None,
     ) -> None:
         """Initialize music service.
 
@@ -40,10 +43,21 @@ class MusicService:
             db: Database session.
             storage: Storage service for file operations.
             metadata_extractor: Service for extracting audio metadata.
+            cache: Cache service for Redis caching. If None, uses global instance.
         """
         self.db = db
         self.storage = storage or StorageService()
         self.metadata_extractor = metadata_extractor or MetadataExtractor()
+        self.cache = cache or get_cache_service()
+
+    async def _invalidate_user_cache(self, owner_id: UUID) -> None:
+        """Invalidate cached data derived from a user's library.
+
+        Args:
+            owner_id: Owner UUID.
+        """
+        await self.cache.delete_pattern(f"recommendations:{owner_id}:*")
+        await self.cache.delete_pattern(f"search:{owner_id}:*")
 
     async def get_song_by_id(self, song_id: UUID, owner_id: UUID) -> Song | None:
         """Get a song by ID.
@@ -202,6 +216,8 @@ class MusicService:
             self.db.add(song)
             await self.db.flush()
 
+            await self._invalidate_user_cache(owner_id)
+
             return song
 
         except Exception as e:
@@ -232,10 +248,13 @@ class MusicService:
 
         # Update only provided fields
         update_dict = update_data.model_dump(exclude_unset=True)
+        if "genre" in update_dict:
+            await move_genre_plays(self.db, song, update_dict["genre"])
         for field, value in update_dict.items():
             setattr(song, field, value)
 
         await self.db.flush()
+        await self._invalidate_user_cache(owner_id)
         return song
 
     async def delete_song(self, song_id: UUID, owner_id: UUID) -> None:
@@ -257,10 +276,13 @@ class MusicService:
         if song.cover_art_path:
             await self.storage.delete_file(song.cover_art_path)
 
-        # Delete from database
+        # Take its plays out of the genre counts before the history cascades
+        await move_genre_plays(self.db, song, None)
         await self.db.delete(song)
         await self.db.flush()
 
+        await self._invalidate_user_cache(owner_id)
+
     async def increment_play_count(self, song_id: UUID, owner_id: UUID) -> Song:
         """Increment song play count.
 
@@ -284,4 +306,6 @@ class MusicService:
         song.last_played_at = datetime.now(UTC)
         await self.db.flush()
 
+        await self._invalidate_user_cache(owner_id)
+
         return song
@@ -9,6 +9,7 @@ from sqlalchemy.orm import selectinload
 from app.models.playlist import Playlist, PlaylistSong
 from app.models.song import Song
 from app.schemas.playlist import PlaylistCreate, PlaylistUpdate
+from app.services.cache import CacheService, get_cache_service
 
 
 class PlaylistServiceError(Exception):
@@ -34,13 +35,27 @@ class SongNotInPlaylistError(PlaylistServiceError):
 class PlaylistService:
     """Service for managing playlists."""
 
-    def __init__(self, db: AsyncSession) -> None:
+    def __init__(
+        self,
+        db: AsyncSession,
+        cache: CacheService | None = None,
+    ) -> None:
         """Initialize playlist service.
 
         Args:
             db: Database session.
+            cache: Cache service for Redis caching. If None, uses global instance.
         """
         self.db = db
+        self.cache = cache or get_cache_service()
+
+    async def _invalidate_search_cache(self, owner_id: UUID) -> None:
+        """Invalidate cached search results, which include playlists.
+
+        Args:
+            owner_id: Owner UUID.
+        """
+        await self.cache.delete_pattern(f"search:{owner_id}:*")
 
     async def get_playlist_by_id(
         self, playlist_id: UUID, owner_id: UUID
@@ -138,6 +153,7 @@ class PlaylistService:
         )
         self.db.add(playlist)
         await self.db.flush()
+        await self._invalidate_search_cache(owner_id)
         return playlist
 
     async def update_playlist(
@@ -167,6 +183,7 @@ class PlaylistService:
         await self.db.flush()
         # Refresh to get server-side updated_at value
         await self.db.refresh(playlist)
+        await self._invalidate_search_cache(owner_id)
         return playlist
 
     async def delete_playlist(self, playlist_id: UUID, owner_id: UUID) -> None:
@@ -185,6 +202,7 @@ class PlaylistService:
 
         await self.db.delete(playlist)
         await self.db.flush()
+        await self._invalidate_search_cache(owner_id)
 
     async def _get_song(self, song_id: UUID, owner_id: UUID) -> Song | None:
         """Get a song by ID.
@@ -313,6 +331,7 @@ class PlaylistService:
         # Recalculate stats (after flush to get correct data)
         await self._recalculate_playlist_stats(playlist)
         await self.db.flush()
+        await self._invalidate_search_cache(owner_id)
 
         # Fetch fresh data with refresh=True to bypass identity map cache
         return await self.get_playlist_with_songs(playlist_id, owner_id, refresh=True)  # type: ignore
@@ -368,6 +387,7 @@ class PlaylistService:
         # Recalculate stats (after flush to get correct data)
         await self._recalculate_playlist_stats(playlist)
         await self.db.flush()
+        await self._invalidate_search_cache(owner_id)
 
         # Fetch fresh data with refresh=True to bypass identity map cache
         return await self.get_playlist_with_songs(playlist_id, owner_id, refresh=True)  # type: ignore
@@ -1,19 +1,41 @@
 """Recommendation service with intelligent music recommendations."""
 
+import hashlib
+import heapq
 import logging
+import math
+import random
+from collections.abc import Callable
 from datetime import UTC, datetime, timedelta
-from typing import Any, cast
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    all_,
+    and_,
+    any_,
+    case,
+    func,
+    literal,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import InstrumentedAttribute, aliased, load_only
 
 from app.models.listening_history import ListeningHistory
-from app.models.playlist import Playlist
+from app.models.playlist import Playlist, PlaylistSong
 from app.models.song import Song
 from app.schemas.recommendation import DiscoverSectionType, MoodType
-from app.services.cache import CacheService, get_cache_service
+from app.services.cache import (
+    CacheService,
+    get_cache_service,
+    song_from_cache,
+    song_to_cache,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +45,68 @@ CACHE_TTL_DISCOVER = 300  # 5 minutes
 CACHE_TTL_MIX = 300  # 5 minutes
 CACHE_TTL_SEARCH = 60  # 1 minute
 
+# In-process copies of recommendation entries; other workers only see
+# invalidations through Redis, so this bounds how stale they can get
+LOCAL_CACHE_TTL = 30
+
+# Personal mix sampling: libraries smaller than MIX_SAMPLE_MIN_ROWS are read
+# whole; from larger ones roughly MIX_SAMPLE_FACTOR times the number of songs
+# needed to fill the requested duration are picked at random.
+MIX_SAMPLE_MIN_ROWS = 1000
+MIX_SAMPLE_FACTOR = 3
+
+# Columns needed to pick personal mix songs
+MIX_CANDIDATE_COLUMNS = (
+    Song.id,
+    Song.artist,
+    Song.duration_seconds,
+    Song.play_count,
+)
+
+# Similarity feature weights
+WEIGHT_GENRE = 0.3
+WEIGHT_BPM = 0.2
+WEIGHT_ENERGY = 0.2
+WEIGHT_VALENCE = 0.15
+WEIGHT_ARTIST = 0.15
+
+# Similarity threshold ladders: (max_diff, score, reason), checked in order
+Thresholds = tuple[tuple[float, float, str | None], ...]
+
+BPM_THRESHOLDS: Thresholds = (
+    (10, 0.2, "similar BPM"),
+    (20, 0.15, "close BPM"),
+    (30, 0.1, None),
+)
+ENERGY_THRESHOLDS: Thresholds = (
+    (0.1, 0.2, "similar energy"),
+    (0.2, 0.15, None),
+    (0.3, 0.1, None),
+)
+VALENCE_THRESHOLDS: Thresholds = (
+    (0.1, 0.15, "similar mood"),
+    (0.2, 0.1, None),
+    (0.3, 0.05, None),
+)
+
+
+def _array_param(
+    column: InstrumentedAttribute[Any], values: list[Any]
+) -> ColumnElement[Any]:
+    """Bind a list as a single array parameter for ANY/ALL comparisons.
+
+    Unlike an expanding IN, the SQL text does not change with the list
+    length, so asyncpg's prepared statement cache is reused across calls.
+
+    Args:
+        column: Column whose type the array elements have.
+        values: Values to bind.
+
+    Returns:
+        Array-typed bound parameter.
+    """
+    return literal(values, ARRAY(column.type))
+
 
 class RecommendationServiceError(Exception):
     """Base exception for recommendation service errors."""
@@ -39,22 +123,27 @@ class RecommendationService:
         self,
         db: AsyncSession,
         cache: CacheService | None = None,
+        rng: random.Random | None = None,
     ) -> None:
         """Initialize recommendation service.
 
         Args:
             db: Database session.
             cache: Cache service for Redis caching. If None, uses global instance.
+            rng: Random generator for mix sampling. Pass a seeded instance for
+                reproducible mixes.
         """
         self.db = db
         self.cache = cache or get_cache_service()
+        self.rng = rng or random.Random()
 
-    def _calculate_similarity(
-        self,
-        source: Song,
-        candidate: Song,
-    ) -> tuple[float, list[str]]:
-        """Calculate similarity between two songs.
+    def _make_scorer(self, source: Song) -> Callable[[Song], tuple[float, list[str]]]:
+        """Build a similarity scorer for a fixed source song.
+
+        Everything that depends only on the source (lower-cased genre and
+        artist, the feature ladders it can take part in) is computed once, so
+        scoring many candidates against the same source only reads candidate
+        attributes.
 
         Uses content-based filtering based on:
         - Genre match
@@ -63,6 +152,72 @@ class RecommendationService:
         - Valence similarity
         - Same artist boost
 
+        Args:
+            source: Source song to compare from.
+
+        Returns:
+            Function mapping a candidate song to (similarity_score, reasons).
+        """
+        source_genre = source.genre.lower() if source.genre else None
+        source_artist = source.artist.lower() if source.artist else None
+        # (candidate attribute, source value, weight, thresholds); a BPM of 0
+        # means "unknown" on either side
+        ladders = tuple(
+            (attribute, source_value, weight, thresholds)
+            for attribute, source_value, weight, thresholds in (
+                ("bpm", source.bpm or None, WEIGHT_BPM, BPM_THRESHOLDS),
+                ("energy", source.energy, WEIGHT_ENERGY, ENERGY_THRESHOLDS),
+                ("valence", source.valence, WEIGHT_VALENCE, VALENCE_THRESHOLDS),
+            )
+            if source_value is not None
+        )
+
+        def score_candidate(candidate: Song) -> tuple[float, list[str]]:
+            score = 0.0
+            reasons: list[str] = []
+            weights_sum = WEIGHT_ARTIST
+
+            if source_genre and candidate.genre:
+                weights_sum += WEIGHT_GENRE
+                if source_genre == candidate.genre.lower():
+                    score += WEIGHT_GENRE
+                    reasons.append("same genre")
+
+            for attribute, source_value, weight, thresholds in ladders:
+                candidate_value = getattr(candidate, attribute)
+                if candidate_value is None or (
+                    attribute == "bpm" and candidate_value == 0
+                ):
+                    continue
+                weights_sum += weight
+                diff = abs(source_value - candidate_value)
+                for max_diff, rung_score, reason in thresholds:
+                    if diff <= max_diff:
+                        score += rung_score
+                        if reason:
+                            reasons.append(reason)
+                        break
+
+            if (
+                source_artist
+                and candidate.artist
+                and source_artist == candidate.artist.lower()
+            ):
+                score += WEIGHT_ARTIST
+                reasons.append("same artist")
+
+            # Normalize by the weights of the features both songs have
+            return max(0.0, min(1.0, score / weights_sum)), reasons
+
+        return score_candidate
+
+    def _calculate_similarity(
+        self,
+        source: Song,
+        candidate: Song,
+    ) -> tuple[float, list[str]]:
+        """Calculate similarity between two songs.
+
         Args:
             source: Source song to compare from.
             candidate: Candidate song to compare to.
@@ -70,72 +225,59 @@ class RecommendationService:
         Returns:
             Tuple of (similarity_score, reasons).
         """
-        score = 0.0
-        reasons: list[str] = []
-        weights_sum = 0.0
-
-        # Genre match (weight: 0.3)
-        if source.genre and candidate.genre:
-            weights_sum += 0.3
-            if source.genre.lower() == candidate.genre.lower():
-                score += 0.3
-                reasons.append("same genre")
-
-        # BPM similarity (weight: 0.2)
-        if source.bpm and candidate.bpm:
-            weights_sum += 0.2
-            bpm_diff = abs(source.bpm - candidate.bpm)
-            if bpm_diff <= 10:
-                score += 0.2
-                reasons.append("similar BPM")
-            elif bpm_diff <= 20:
-                score += 0.15
-                reasons.append("close BPM")
-            elif bpm_diff <= 30:
-                score += 0.1
-
-        # Energy similarity (weight: 0.2)
-        if source.energy is not None and candidate.energy is not None:
-            weights_sum += 0.2
-            energy_diff = abs(source.energy - candidate.energy)
-            if energy_diff <= 0.1:
-                score += 0.2
-                reasons.append("similar energy")
-            elif energy_diff <= 0.2:
-                score += 0.15
-            elif energy_diff <= 0.3:
-                score += 0.1
-
-        # Valence similarity (weight: 0.15)
-        if source.valence is not None and candidate.valence is not None:
-            weights_sum += 0.15
-            valence_diff = abs(source.valence - candidate.valence)
-            if valence_diff <= 0.1:
-                score += 0.15
-                reasons.append("similar mood")
-            elif valence_diff <= 0.2:
-                score += 0.1
-            elif valence_diff <= 0.3:
-                score += 0.05
-
-        # Same artist boost (weight: 0.15)
-        weights_sum += 0.15
-        if (
-            source.artist
-            and candidate.artist
-            and source.artist.lower() == candidate.artist.lower()
-        ):
-            score += 0.15
-            reasons.append("same artist")
-
-        # Normalize score if we have any weights
-        # Use 0.3 as fallback when no parameters available for comparison
-        score = score / weights_sum if weights_sum > 0 else 0.3
-
-        # Ensure score is between 0 and 1
-        score = max(0.0, min(1.0, score))
-
-        return score, reasons
+        return self._make_scorer(source)(candidate)
+
+    def _similarity_score_expr(self, source: Song) -> ColumnElement[float]:
+        """Build a SQL expression scoring Song rows against a source song.
+
+        Mirrors _calculate_similarity so PostgreSQL can rank candidates and
+        only the top rows cross the ORM boundary.
+
+        Args:
+            source: Source song to compare from.
+
+        Returns:
+            SQL expression evaluating to the normalized similarity score.
+        """
+        score: ColumnElement[float] = literal(0.0, Float)
+        weights_sum: ColumnElement[float] = literal(WEIGHT_ARTIST, Float)
+
+        if source.genre:
+            weights_sum = weights_sum + case(
+                (and_(Song.genre.isnot(None), Song.genre != ""), WEIGHT_GENRE),
+                else_=0.0,
+            )
+            score = score + case(
+                (func.lower(Song.genre) == source.genre.lower(), WEIGHT_GENRE),
+                else_=0.0,
+            )
+
+        ladders: tuple[tuple[Any, float | None, float, Thresholds], ...] = (
+            # A BPM of 0 means "unknown", same as in _calculate_similarity
+            (func.nullif(Song.bpm, 0), source.bpm or None, WEIGHT_BPM, BPM_THRESHOLDS),
+            (Song.energy, source.energy, WEIGHT_ENERGY, ENERGY_THRESHOLDS),
+            (Song.valence, source.valence, WEIGHT_VALENCE, VALENCE_THRESHOLDS),
+        )
+        for column, source_value, weight, thresholds in ladders:
+            if source_value is None:
+                continue
+            diff = func.abs(column - source_value)
+            weights_sum = weights_sum + case((column.isnot(None), weight), else_=0.0)
+            score = score + case(
+                *[
+                    (diff <= max_diff, rung_score)
+                    for max_diff, rung_score, _ in thresholds
+                ],
+                else_=0.0,
+            )
+
+        if source.artist:
+            score = score + case(
+                (func.lower(Song.artist) == source.artist.lower(), WEIGHT_ARTIST),
+                else_=0.0,
+            )
+
+        return score / weights_sum
 
     async def get_similar_songs(
         self,
@@ -156,7 +298,17 @@ class RecommendationService:
         Raises:
             SongNotFoundError: If source song not found.
         """
-        # Get source song
+        # Try cache first: entries hold the source song too and are dropped
+        # whenever the library changes, so a hit needs no database access
+        cache_key = f"recommendations:{user_id}:similar:{song_id}:{limit}"
+        cached = await self.cache.get(cache_key, LOCAL_CACHE_TTL)
+        if cached is not None:
+            return song_from_cache(cached["source"]), [
+                (song_from_cache(item["song"]), item["score"], item["reasons"])
+                for item in cached["similar"]
+            ]
+
+        # Get source song; its features are baked into the scoring expression
         result = await self.db.execute(
             select(Song).where(Song.id == song_id, Song.owner_id == user_id)
         )
@@ -164,48 +316,31 @@ class RecommendationService:
         if not source_song:
             raise SongNotFoundError(f"Song not found: {song_id}")
 
-        # Try cache
-        cache_key = f"recommendations:similar:{user_id}:{song_id}:{limit}"
-        cached = await self.cache.get(cache_key)
-        if cached is not None:
-            # Rebuild from cache - fetch songs by IDs
-            song_ids = [UUID(item["song_id"]) for item in cached]
-            if song_ids:
-                songs_result = await self.db.execute(
-                    select(Song).where(Song.id.in_(song_ids))
-                )
-                songs_map = {s.id: s for s in songs_result.scalars().all()}
-
-                similar_songs = []
-                for item in cached:
-                    song = songs_map.get(UUID(item["song_id"]))
-                    if song:
-                        similar_songs.append((song, item["score"], item["reasons"]))
-                return source_song, similar_songs
-
-        # Get all other songs from user's library
+        # Rank candidates in SQL and only load the top N rows
+        score_expr = self._similarity_score_expr(source_song)
         result = await self.db.execute(
-            select(Song).where(Song.owner_id == user_id, Song.id != song_id)
+            select(Song)
+            .where(Song.owner_id == user_id, Song.id != song_id, score_expr > 0)
+            .order_by(score_expr.desc())
+            .limit(limit)
         )
-        candidate_songs = list(result.scalars().all())
 
-        # Calculate similarity for each candidate
-        scored_songs: list[tuple[Song, float, list[str]]] = []
-        for candidate in candidate_songs:
-            score, reasons = self._calculate_similarity(source_song, candidate)
-            if score > 0:
-                scored_songs.append((candidate, score, reasons))
-
-        # Sort by similarity score and take top N
-        scored_songs.sort(key=lambda x: x[1], reverse=True)
-        similar_songs = scored_songs[:limit]
+        # Rebuild exact scores and reasons for the returned rows only
+        score_candidate = self._make_scorer(source_song)
+        similar_songs = []
+        for candidate in result.scalars().all():
+            score, reasons = score_candidate(candidate)
+            similar_songs.append((candidate, score, reasons))
 
         # Cache the results
-        cache_data = [
-            {"song_id": str(song.id), "score": score, "reasons": reasons}
-            for song, score, reasons in similar_songs
-        ]
-        await self.cache.set(cache_key, cache_data, CACHE_TTL_SIMILAR)
+        cache_data = {
+            "source": song_to_cache(source_song),
+            "similar": [
+                {"song": song_to_cache(song), "score": score, "reasons": reasons}
+                for song, score, reasons in similar_songs
+            ],
+        }
+        await self.cache.set(cache_key, cache_data, CACHE_TTL_SIMILAR, LOCAL_CACHE_TTL)
 
         return source_song, similar_songs
 
@@ -225,8 +360,9 @@ class RecommendationService:
         Returns:
             List of (song, transition_count) tuples.
         """
-        # Find songs that were played after this song
-        query = (
+        # Count songs played after this one and load them in the same query;
+        # served by an index-only scan on (previous_song_id, user_id, song_id)
+        transitions = (
             select(
                 ListeningHistory.song_id,
                 func.count().label("transition_count"),
@@ -238,24 +374,15 @@ class RecommendationService:
             .group_by(ListeningHistory.song_id)
             .order_by(func.count().desc())
             .limit(limit)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(Song, transitions.c.transition_count)
+            .join(transitions, Song.id == transitions.c.song_id)
+            .order_by(transitions.c.transition_count.desc())
         )
 
-        result = await self.db.execute(query)
-        transition_rows = result.fetchall()
-
-        if not transition_rows:
-            return []
-
-        # Get song details
-        song_ids = [row[0] for row in transition_rows]
-        songs_result = await self.db.execute(select(Song).where(Song.id.in_(song_ids)))
-        songs_map = {s.id: s for s in songs_result.scalars().all()}
-
-        return [
-            (songs_map[row[0]], row[1])
-            for row in transition_rows
-            if row[0] in songs_map
-        ]
+        return [(row.Song, row.transition_count) for row in result.all()]
 
     async def get_discover_recommendations(
         self,
@@ -277,122 +404,131 @@ class RecommendationService:
             Dict mapping section type to list of songs.
         """
         # Try cache
-        cache_key = f"recommendations:discover:{user_id}:{limit}"
-        cached = await self.cache.get(cache_key)
+        cache_key = f"recommendations:{user_id}:discover:{limit}"
+        cached = await self.cache.get(cache_key, LOCAL_CACHE_TTL)
         if cached is not None:
-            # Rebuild from cache
-            all_song_ids: list[UUID] = []
-            for section_data in cached.values():
-                all_song_ids.extend([UUID(sid) for sid in section_data])
-
-            if all_song_ids:
-                songs_result = await self.db.execute(
-                    select(Song).where(Song.id.in_(all_song_ids))
-                )
-                songs_map = {s.id: s for s in songs_result.scalars().all()}
-
-                cached_sections: dict[DiscoverSectionType, list[Song]] = {}
-                for section_type_str, song_ids_list in cached.items():
-                    section_type = DiscoverSectionType(section_type_str)
-                    cached_sections[section_type] = [
-                        songs_map[UUID(sid)]
-                        for sid in song_ids_list
-                        if UUID(sid) in songs_map
-                    ]
-                return cached_sections
+            return {
+                DiscoverSectionType(section_type): [
+                    song_from_cache(item) for item in section_songs
+                ]
+                for section_type, section_songs in cached.items()
+            }
 
         sections: dict[DiscoverSectionType, list[Song]] = {}
 
-        # Long time no listen: high play_count, old last_played_at
+        # One pass over the library ranks songs for both play_count sections:
+        # - long_time_no_listen: high play_count, old last_played_at
+        # - the user's top 5 songs by play_count, the seeds for the others
         thirty_days_ago = datetime.now(UTC) - timedelta(days=30)
-        long_time_query = (
-            select(Song)
+        is_long_time = and_(
+            Song.play_count >= 5,
+            or_(
+                Song.last_played_at.is_(None),
+                Song.last_played_at < thirty_days_ago,
+            ),
+        )
+        ranked = (
+            select(
+                Song.id.label("song_id"),
+                Song.play_count.label("play_count"),
+                is_long_time.label("is_long_time"),
+                func.row_number()
+                .over(order_by=Song.play_count.desc())
+                .label("top_rank"),
+                func.row_number()
+                .over(partition_by=is_long_time, order_by=Song.play_count.desc())
+                .label("long_time_rank"),
+            )
+            .where(Song.owner_id == user_id)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(
+                Song,
+                ranked.c.top_rank,
+                ranked.c.is_long_time,
+                ranked.c.long_time_rank,
+            )
+            .join(ranked, Song.id == ranked.c.song_id)
             .where(
-                Song.owner_id == user_id,
-                Song.play_count >= 5,
                 or_(
-                    Song.last_played_at.is_(None),
-                    Song.last_played_at < thirty_days_ago,
-                ),
+                    ranked.c.top_rank <= 5,
+                    and_(ranked.c.is_long_time, ranked.c.long_time_rank <= limit),
+                )
             )
-            .order_by(Song.play_count.desc())
-            .limit(limit)
+            .order_by(ranked.c.play_count.desc(), ranked.c.top_rank)
         )
-        result = await self.db.execute(long_time_query)
-        sections[DiscoverSectionType.LONG_TIME_NO_LISTEN] = list(result.scalars().all())
 
-        # Get user's top 5 favorite songs by play_count
-        top_songs_query = (
-            select(Song)
-            .where(Song.owner_id == user_id)
-            .order_by(Song.play_count.desc())
-            .limit(5)
-        )
-        result = await self.db.execute(top_songs_query)
-        top_songs = list(result.scalars().all())
+        top_songs: list[Song] = []
+        long_time: list[Song] = []
+        for song, top_rank, long_time_song, long_time_rank in result.all():
+            if top_rank <= 5:
+                top_songs.append(song)
+            if long_time_song and long_time_rank <= limit:
+                long_time.append(song)
+        sections[DiscoverSectionType.LONG_TIME_NO_LISTEN] = long_time
 
-        # Based on favorite: songs similar to top songs
         if top_songs:
-            # Get all other songs
+            # Average similarity to the top songs, computed by PostgreSQL
             top_song_ids = [s.id for s in top_songs]
-            result = await self.db.execute(
-                select(Song).where(
+            avg_score = sum(
+                (self._similarity_score_expr(top_song) for top_song in top_songs),
+                literal(0.0, Float),
+            ) / len(top_songs)
+
+            # Score every candidate once and rank it for both sections:
+            # - based_on_favorite: songs most similar to the top songs
+            # - hidden_gems: low play_count songs that are reasonably similar
+            is_gem = and_(Song.play_count <= 3, avg_score > 0.3)
+            scored = (
+                select(
+                    Song.id.label("song_id"),
+                    avg_score.label("score"),
+                    is_gem.label("is_gem"),
+                    func.row_number()
+                    .over(order_by=avg_score.desc())
+                    .label("favorite_rank"),
+                    func.row_number()
+                    .over(partition_by=is_gem, order_by=avg_score.desc())
+                    .label("gem_rank"),
+                )
+                .where(
                     Song.owner_id == user_id,
-                    ~Song.id.in_(top_song_ids),
+                    Song.id != all_(_array_param(Song.id, top_song_ids)),
                 )
+                .subquery()
             )
-            candidate_songs = list(result.scalars().all())
-
-            # Calculate average similarity to top songs
-            scored_candidates: list[tuple[Song, float]] = []
-            for candidate in candidate_songs:
-                total_score = 0.0
-                for top_song in top_songs:
-                    score, _ = self._calculate_similarity(top_song, candidate)
-                    total_score += score
-                avg_score = total_score / len(top_songs)
-                scored_candidates.append((candidate, avg_score))
-
-            scored_candidates.sort(key=lambda x: x[1], reverse=True)
-            sections[DiscoverSectionType.BASED_ON_FAVORITE] = [
-                s[0] for s in scored_candidates[:limit]
-            ]
-        else:
-            sections[DiscoverSectionType.BASED_ON_FAVORITE] = []
-
-        # Hidden gems: low play_count but similar to favorites
-        if top_songs:
-            low_play_query = select(Song).where(
-                Song.owner_id == user_id,
-                Song.play_count <= 3,
-                ~Song.id.in_(top_song_ids),
+            result = await self.db.execute(
+                select(Song, scored.c.favorite_rank, scored.c.is_gem, scored.c.gem_rank)
+                .join(scored, Song.id == scored.c.song_id)
+                .where(
+                    or_(
+                        scored.c.favorite_rank <= limit,
+                        and_(scored.c.is_gem, scored.c.gem_rank <= limit),
+                    )
+                )
+                .order_by(scored.c.score.desc())
             )
-            result = await self.db.execute(low_play_query)
-            low_play_songs = list(result.scalars().all())
-
-            scored_gems: list[tuple[Song, float]] = []
-            for candidate in low_play_songs:
-                total_score = 0.0
-                for top_song in top_songs:
-                    score, _ = self._calculate_similarity(top_song, candidate)
-                    total_score += score
-                avg_score = total_score / len(top_songs)
-                if avg_score > 0.3:  # Only include if reasonably similar
-                    scored_gems.append((candidate, avg_score))
-
-            scored_gems.sort(key=lambda x: x[1], reverse=True)
-            sections[DiscoverSectionType.HIDDEN_GEMS] = [
-                s[0] for s in scored_gems[:limit]
-            ]
+
+            based_on_favorite: list[Song] = []
+            hidden_gems: list[Song] = []
+            for song, favorite_rank, gem, gem_rank in result.all():
+                if favorite_rank <= limit:
+                    based_on_favorite.append(song)
+                if gem and gem_rank <= limit:
+                    hidden_gems.append(song)
+            sections[DiscoverSectionType.BASED_ON_FAVORITE] = based_on_favorite
+            sections[DiscoverSectionType.HIDDEN_GEMS] = hidden_gems
         else:
+            sections[DiscoverSectionType.BASED_ON_FAVORITE] = []
             sections[DiscoverSectionType.HIDDEN_GEMS] = []
 
         # Cache results
         cache_data = {
-            section_type.value: [str(s.id) for s in songs]
+            section_type.value: [song_to_cache(s) for s in songs]
             for section_type, songs in sections.items()
         }
-        await self.cache.set(cache_key, cache_data, CACHE_TTL_DISCOVER)
+        await self.cache.set(cache_key, cache_data, CACHE_TTL_DISCOVER, LOCAL_CACHE_TTL)
 
         return sections
 
@@ -412,45 +548,30 @@ class RecommendationService:
         Returns:
             Tuple of (songs list, total_duration_seconds).
         """
-        # Try cache
-        cache_key = f"recommendations:mix:{user_id}:{mood}:{duration_minutes}"
-        cached = await self.cache.get(cache_key)
+        # Try cache; the library summary used for sampling comes in the same
+        # round trip
+        cache_key = f"recommendations:{user_id}:mix:{mood}:{duration_minutes}"
+        cached, library = await self.cache.get_many(
+            [cache_key, self._mix_library_key(user_id, mood)], LOCAL_CACHE_TTL
+        )
         if cached is not None:
-            song_ids = [UUID(sid) for sid in cached["song_ids"]]
-            if song_ids:
-                songs_result = await self.db.execute(
-                    select(Song).where(Song.id.in_(song_ids))
-                )
-                songs_map = {s.id: s for s in songs_result.scalars().all()}
-                songs = [songs_map[sid] for sid in song_ids if sid in songs_map]
-                return songs, cached["total_duration"]
-            return [], 0
+            songs = [song_from_cache(item) for item in cached["songs"]]
+            return songs, cached["total_duration"]
 
         target_duration = duration_minutes * 60  # Convert to seconds
 
-        # Base query
-        query = select(Song).where(Song.owner_id == user_id)
-
-        # Apply mood filter based on energy/valence
-        if mood == MoodType.ENERGETIC:
-            query = query.where(or_(Song.energy.is_(None), Song.energy >= 0.6))
-        elif mood == MoodType.CALM:
-            query = query.where(or_(Song.energy.is_(None), Song.energy <= 0.4))
-        elif mood == MoodType.FOCUS:
-            # Focus: moderate energy, lower valence (less emotional)
-            query = query.where(
-                or_(
-                    Song.energy.is_(None),
-                    (Song.energy >= 0.3) & (Song.energy <= 0.7),
-                )
-            )
-
-        # Order by mix of play_count and randomness
-        # Prioritize well-liked songs but add variety
-        query = query.order_by(func.random() * 0.5 + (Song.play_count / 100.0) * 0.5)
+        candidates = await self._get_mix_candidates(
+            user_id, mood, target_duration, library
+        )
 
-        result = await self.db.execute(query)
-        all_songs = list(result.scalars().all())
+        # Weighted random order (Efraimidis-Spirakis keys): every song can
+        # appear, but frequently played ones tend to come first. A heap only
+        # orders the songs actually popped, which is usually a small prefix.
+        heap = [
+            (-(self.rng.random() ** (1.0 / (1.0 + song.play_count / 100.0))), i, song)
+            for i, song in enumerate(candidates)
+        ]
+        heapq.heapify(heap)
 
         # Select songs to fill the duration
         # Ensure variety: max 3 tracks per artist
@@ -458,9 +579,8 @@ class RecommendationService:
         artist_counts: dict[str, int] = {}
         current_duration = 0
 
-        for song in all_songs:
-            if current_duration >= target_duration:
-                break
+        while heap and current_duration < target_duration:
+            _, _, song = heapq.heappop(heap)
 
             # Check artist limit
             artist = song.artist or "Unknown"
@@ -471,17 +591,143 @@ class RecommendationService:
             artist_counts[artist] = artist_counts.get(artist, 0) + 1
             current_duration += song.duration_seconds
 
+        # Candidates were loaded with only the selection columns
+        if selected_songs:
+            result = await self.db.execute(
+                select(Song)
+                .where(
+                    Song.id
+                    == any_(_array_param(Song.id, [s.id for s in selected_songs]))
+                )
+                .execution_options(populate_existing=True)
+            )
+            songs_by_id = {song.id: song for song in result.scalars().all()}
+            selected_songs = [songs_by_id[s.id] for s in selected_songs]
+
         total_duration = sum(s.duration_seconds for s in selected_songs)
 
         # Cache results
         cache_data = {
-            "song_ids": [str(s.id) for s in selected_songs],
+            "songs": [song_to_cache(s) for s in selected_songs],
             "total_duration": total_duration,
         }
-        await self.cache.set(cache_key, cache_data, CACHE_TTL_MIX)
+        await self.cache.set(cache_key, cache_data, CACHE_TTL_MIX, LOCAL_CACHE_TTL)
 
         return selected_songs, total_duration
 
+    @staticmethod
+    def _mix_library_key(user_id: UUID, mood: MoodType | None) -> str:
+        """Build the cache key of a user's mix library summary.
+
+        The summary (song count and average duration) lives under the
+        recommendations prefix, so library changes invalidate it.
+
+        Args:
+            user_id: User UUID.
+            mood: Optional mood filter.
+
+        Returns:
+            Cache key.
+        """
+        return f"recommendations:{user_id}:mix_library:{mood}"
+
+    @staticmethod
+    def _mood_filter(
+        energy: InstrumentedAttribute[float | None], mood: MoodType | None
+    ) -> ColumnElement[bool] | None:
+        """Build the energy filter for a mix mood.
+
+        Args:
+            energy: Energy column to filter on.
+            mood: Optional mood filter.
+
+        Returns:
+            Filter expression, or None if the mood does not restrict energy.
+        """
+        if mood == MoodType.ENERGETIC:
+            return or_(energy.is_(None), energy >= 0.6)
+        if mood == MoodType.CALM:
+            return or_(energy.is_(None), energy <= 0.4)
+        if mood == MoodType.FOCUS:
+            # Focus: moderate energy, lower valence (less emotional)
+            return or_(energy.is_(None), and_(energy >= 0.3, energy <= 0.7))
+        return None
+
+    async def _get_mix_candidates(
+        self,
+        user_id: UUID,
+        mood: MoodType | None,
+        target_duration: int,
+        library: dict[str, Any] | None = None,
+    ) -> list[Song]:
+        """Fetch candidate songs for a personal mix.
+
+        From large libraries only a random sample of a few times the songs
+        needed is loaded. The sample is taken with ORDER BY random() LIMIT n
+        under the owner filter, so Postgres reads just this user's rows
+        through the owner_id indexes and keeps the top n in a bounded heap,
+        instead of sampling the shared songs table. Falls back to the full
+        filtered library when it is small or the sample cannot fill the
+        target duration.
+
+        Only the columns needed to pick songs are loaded; callers must load
+        the full rows of the songs they keep.
+
+        Args:
+            user_id: User UUID.
+            mood: Optional mood filter.
+            target_duration: Target mix duration in seconds.
+            library: Cached library summary, if already fetched.
+
+        Returns:
+            Unordered list of candidate songs.
+        """
+        mood_filter = self._mood_filter(Song.energy, mood)
+        conditions = [Song.owner_id == user_id]
+        if mood_filter is not None:
+            conditions.append(mood_filter)
+
+        # Library size and average duration
+        if library is None:
+            result = await self.db.execute(
+                select(func.count(Song.id), func.avg(Song.duration_seconds)).where(
+                    *conditions
+                )
+            )
+            row_count, avg_duration = result.one()
+            library = {
+                "count": row_count,
+                "avg_duration": float(avg_duration or 0),
+            }
+            await self.cache.set(
+                self._mix_library_key(user_id, mood),
+                library,
+                CACHE_TTL_MIX,
+                LOCAL_CACHE_TTL,
+            )
+
+        if library["count"] == 0:
+            return []
+
+        needed = target_duration / max(library["avg_duration"], 1.0)
+        sample_size = math.ceil(needed * MIX_SAMPLE_FACTOR)
+        if library["count"] >= MIX_SAMPLE_MIN_ROWS and sample_size < library["count"]:
+            result = await self.db.execute(
+                select(Song)
+                .options(load_only(*MIX_CANDIDATE_COLUMNS))
+                .where(*conditions)
+                .order_by(func.random())
+                .limit(sample_size)
+            )
+            candidates = list(result.scalars().all())
+            if sum(s.duration_seconds for s in candidates) >= target_duration:
+                return candidates
+
+        result = await self.db.execute(
+            select(Song).options(load_only(*MIX_CANDIDATE_COLUMNS)).where(*conditions)
+        )
+        return list(result.scalars().all())
+
     async def _invalidate_user_cache(self, user_id: UUID) -> None:
         """Invalidate all cached recommendations for a user.
 
@@ -529,6 +775,15 @@ class SearchService:
         if not query or len(query.strip()) < 1:
             return {"songs": [], "artists": [], "albums": [], "playlists": []}
 
+        # ILIKE is case-insensitive, so queries differing only in case share
+        # a cache entry
+        normalized = query.strip().lower()
+        digest = hashlib.sha1(normalized.encode(), usedforsecurity=False).hexdigest()
+        cache_key = f"search:{user_id}:{search_type}:{limit}:{digest[:16]}"
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return self._results_from_cache(cached)
+
         search_term = f"%{query.strip()}%"
 
         results: dict[str, list[Any]] = {
@@ -575,23 +830,27 @@ class SearchService:
             result = await self.db.execute(artists_query)
             artist_rows = result.fetchall()
 
-            artists_result = []
-            for artist_name, song_count in artist_rows:
-                # Get top songs for this artist
-                songs_result = await self.db.execute(
-                    select(Song)
-                    .where(Song.owner_id == user_id, Song.artist == artist_name)
-                    .order_by(Song.play_count.desc())
-                    .limit(5)
-                )
-                songs = list(songs_result.scalars().all())
-                artists_result.append(
-                    {
-                        "name": artist_name,
-                        "song_count": song_count,
-                        "songs": songs,
-                    }
+            # Top songs for all matched artists in one windowed query
+            top_songs: dict[tuple[Any, ...], list[Song]] = {}
+            if artist_rows:
+                top_songs = await self._top_songs_by_group(
+                    user_id,
+                    (Song.artist,),
+                    Song.artist
+                    == any_(
+                        _array_param(Song.artist, [row.artist for row in artist_rows])
+                    ),
+                    Song.play_count.desc(),
+                    5,
                 )
+            artists_result = [
+                {
+                    "name": artist_name,
+                    "song_count": song_count,
+                    "songs": top_songs.get((artist_name,), []),
+                }
+                for artist_name, song_count in artist_rows
+            ]
             results["artists"] = artists_result
 
         # Search albums (aggregate songs by album)
@@ -614,34 +873,43 @@ class SearchService:
             result = await self.db.execute(albums_query)
             album_rows = result.fetchall()
 
-            albums_result = []
-            for album_name, artist_name, song_count in album_rows:
-                # Get songs from this album
-                songs_result = await self.db.execute(
-                    select(Song)
-                    .where(
-                        Song.owner_id == user_id,
-                        Song.album == album_name,
-                    )
-                    .order_by(Song.track_number)
-                    .limit(10)
-                )
-                songs = list(songs_result.scalars().all())
-                albums_result.append(
-                    {
-                        "name": album_name,
-                        "artist": artist_name,
-                        "song_count": song_count,
-                        "songs": songs,
-                    }
+            # Tracks for all matched albums in one windowed query
+            album_songs: dict[tuple[Any, ...], list[Song]] = {}
+            if album_rows:
+                album_songs = await self._top_songs_by_group(
+                    user_id,
+                    (Song.album, Song.artist),
+                    Song.album
+                    == any_(
+                        _array_param(Song.album, [row.album for row in album_rows])
+                    ),
+                    Song.track_number,
+                    10,
                 )
+            albums_result = [
+                {
+                    "name": album_name,
+                    "artist": artist_name,
+                    "song_count": song_count,
+                    "songs": album_songs.get((album_name, artist_name), []),
+                }
+                for album_name, artist_name, song_count in album_rows
+            ]
             results["albums"] = albums_result
 
         # Search playlists
         if search_type in ("all", "playlists"):
+            # Count songs in SQL rather than loading every playlist entry;
+            # the stored Playlist.song_count is not updated when a song is
+            # deleted from the library
+            song_count = (
+                select(func.count(PlaylistSong.id))
+                .where(PlaylistSong.playlist_id == Playlist.id)
+                .correlate(Playlist)
+                .scalar_subquery()
+            )
             playlists_query = (
-                select(Playlist)
-                .options(selectinload(Playlist.playlist_songs))
+                select(Playlist.id, Playlist.name, song_count.label("song_count"))
                 .where(
                     Playlist.owner_id == user_id,
                     Playlist.name.ilike(search_term),
@@ -650,14 +918,107 @@ class SearchService:
                 .limit(limit)
             )
             result = await self.db.execute(playlists_query)
-            playlists = cast(list[Playlist], list(result.scalars().all()))
             results["playlists"] = [
                 {
-                    "id": str(p.id),
-                    "name": p.name,
-                    "song_count": len(p.playlist_songs),
+                    "id": str(row.id),
+                    "name": row.name,
+                    "song_count": row.song_count,
                 }
-                for p in playlists
+                for row in result.all()
             ]
 
+        await self.cache.set(
+            cache_key, self._results_to_cache(results), CACHE_TTL_SEARCH
+        )
+
         return results
+
+    @staticmethod
+    def _results_to_cache(results: dict[str, list[Any]]) -> dict[str, list[Any]]:
+        """Serialize search results into a JSON-friendly cache payload.
+
+        Args:
+            results: Search results by category.
+
+        Returns:
+            Results with songs replaced by dictionaries.
+        """
+        return {
+            "songs": [song_to_cache(s) for s in results["songs"]],
+            "artists": [
+                {**a, "songs": [song_to_cache(s) for s in a["songs"]]}
+                for a in results["artists"]
+            ],
+            "albums": [
+                {**a, "songs": [song_to_cache(s) for s in a["songs"]]}
+                for a in results["albums"]
+            ],
+            "playlists": results["playlists"],
+        }
+
+    @staticmethod
+    def _results_from_cache(cached: dict[str, list[Any]]) -> dict[str, list[Any]]:
+        """Rebuild search results from a cache payload.
+
+        Args:
+            cached: Payload produced by _results_to_cache.
+
+        Returns:
+            Search results by category with transient Song instances.
+        """
+        return {
+            "songs": [song_from_cache(s) for s in cached["songs"]],
+            "artists": [
+                {**a, "songs": [song_from_cache(s) for s in a["songs"]]}
+                for a in cached["artists"]
+            ],
+            "albums": [
+                {**a, "songs": [song_from_cache(s) for s in a["songs"]]}
+                for a in cached["albums"]
+            ],
+            "playlists": cached["playlists"],
+        }
+
+    async def _top_songs_by_group(
+        self,
+        user_id: UUID,
+        group_by: tuple[InstrumentedAttribute[Any], ...],
+        condition: ColumnElement[bool],
+        order_by: Any,
+        per_group: int,
+    ) -> dict[tuple[Any, ...], list[Song]]:
+        """Fetch the first songs of several groups in a single query.
+
+        Ranks songs with ROW_NUMBER() partitioned by the group columns, so
+        all groups are loaded in one round trip instead of one per group.
+
+        Args:
+            user_id: User UUID.
+            group_by: Song columns identifying a group.
+            condition: Filter selecting the songs of the wanted groups.
+            order_by: Ordering of songs within a group.
+            per_group: Maximum number of songs per group.
+
+        Returns:
+            Songs keyed by their group column values, in group order.
+        """
+        rank = (
+            func.row_number()
+            .over(partition_by=group_by, order_by=order_by)
+            .label("rank")
+        )
+        ranked = (
+            select(Song, rank).where(Song.owner_id == user_id, condition).subquery()
+        )
+        ranked_song = aliased(Song, ranked)
+        result = await self.db.execute(
+            select(ranked_song)
+            .where(ranked.c.rank <= per_group)
+            .order_by(ranked.c.rank)
+        )
+
+        groups: dict[tuple[Any, ...], list[Song]] = {}
+        for song in result.scalars().all():
+            key = tuple(getattr(song, column.key) for column in group_by)
+            groups.setdefault(key, []).append(song)
+        return groups
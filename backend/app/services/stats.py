@@ -1,21 +1,53 @@
 """Statistics service with business logic for listening history and analytics."""
 
 from datetime import UTC, datetime, timedelta
-from uuid import UUID
-
-from sqlalchemy import distinct, func, select
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Integer,
+    String,
+    and_,
+    cast,
+    column,
+    distinct,
+    func,
+    lambda_stmt,
+    literal,
+    literal_column,
+    select,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload, selectinload
 
-from app.models.listening_history import ContextType, ListeningHistory
+from app.models.listening_history import (
+    ContextType,
+    ListeningHistory,
+    UserGenrePlays,
+)
 from app.models.song import Song
 from app.schemas.stats import ContextType as SchemaContextType
 from app.schemas.stats import (
     DailyListeningCount,
     HourlyListeningCount,
+    PlayImportItem,
     StatsPeriod,
 )
-from app.services.cache import CacheService, get_cache_service
+from app.services.cache import (
+    CACHED_SONG_FIELDS,
+    CacheService,
+    LocalTTLCache,
+    get_cache_service,
+    song_from_cache,
+    song_to_cache,
+)
 
 
 class StatsServiceError(Exception):
@@ -28,8 +60,94 @@ class SongNotFoundError(StatsServiceError):
 
 # Cache TTL in seconds
 CACHE_TTL_OVERVIEW = 300  # 5 minutes
+CACHE_STALE_TTL_OVERVIEW = 60  # served stale while one request refreshes
 CACHE_TTL_TOP_SONGS = 300  # 5 minutes
 CACHE_TTL_TOP_ARTISTS = 300  # 5 minutes
+MISSING_SONG_TTL = 5  # seconds a failed play lookup is remembered
+
+# Length of each bounded statistics period
+PERIOD_LENGTHS = {
+    StatsPeriod.DAY: timedelta(days=1),
+    StatsPeriod.WEEK: timedelta(weeks=1),
+    StatsPeriod.MONTH: timedelta(days=30),
+    StatsPeriod.YEAR: timedelta(days=365),
+}
+
+# Plays recorded for songs that do not exist, keyed by user and song, so that
+# a client retrying a bad play is answered without a database round trip.
+# Song IDs are never reused, so these entries cannot go stale.
+_missing_songs = LocalTTLCache()
+
+# Song columns rendered for top songs, matching the cached song payload
+TOP_SONG_COLUMNS = (
+    Song.id,
+    Song.created_at,
+    Song.last_played_at,
+    *(getattr(Song, field) for field in CACHED_SONG_FIELDS),
+)
+
+
+async def add_genre_plays(
+    db: AsyncSession, user_id: UUID, genre: str, plays: int
+) -> None:
+    """Add plays to a user's all-time play count for a genre.
+
+    Args:
+        db: Database session.
+        user_id: User UUID.
+        genre: Genre the plays count towards.
+        plays: Number of plays to add; negative to take plays away.
+    """
+    stmt = insert(UserGenrePlays).values(user_id=user_id, genre=genre, play_count=plays)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserGenrePlays.user_id, UserGenrePlays.genre],
+            set_={"play_count": UserGenrePlays.play_count + stmt.excluded.play_count},
+        )
+    )
+
+
+async def move_genre_plays(
+    db: AsyncSession,
+    song: Song,
+    new_genre: str | None,
+) -> None:
+    """Move the recorded plays of a song to another genre.
+
+    Call before changing the genre of a song, or with new_genre None before
+    deleting it.
+
+    Args:
+        db: Database session.
+        song: Song whose genre changes.
+        new_genre: Genre the plays count towards from now on.
+    """
+    if song.genre == new_genre:
+        return
+
+    result = await db.execute(
+        select(func.count()).where(ListeningHistory.song_id == song.id)
+    )
+    plays = result.scalar_one()
+    if not plays:
+        return
+
+    if song.genre is not None:
+        await add_genre_plays(db, song.owner_id, song.genre, -plays)
+    if new_genre is not None:
+        await add_genre_plays(db, song.owner_id, new_genre, plays)
+
+
+def _stats_cache_key(user_id: UUID) -> str:
+    """Return the cache hash holding all cached stats of a user.
+
+    Args:
+        user_id: User UUID.
+
+    Returns:
+        Redis key of the hash; fields name the cached query.
+    """
+    return f"stats:{user_id}"
 
 
 class StatsService:
@@ -49,26 +167,22 @@ class StatsService:
         self.db = db
         self.cache = cache or get_cache_service()
 
-    def _get_period_start(self, period: StatsPeriod) -> datetime | None:
-        """Get the start datetime for a given period.
+    def _get_period_start(self, period: StatsPeriod) -> ColumnElement[datetime] | None:
+        """Get the start of a given period as a SQL expression.
+
+        The start is computed by PostgreSQL from now(), so every query of
+        a request sees the same transaction timestamp.
 
         Args:
             period: The statistics period.
 
         Returns:
-            Start datetime for the period, or None for 'all'.
+            Start of the period, or None for 'all'.
         """
-        now = datetime.now(UTC)
-        if period == StatsPeriod.DAY:
-            return now - timedelta(days=1)
-        elif period == StatsPeriod.WEEK:
-            return now - timedelta(weeks=1)
-        elif period == StatsPeriod.MONTH:
-            return now - timedelta(days=30)
-        elif period == StatsPeriod.YEAR:
-            return now - timedelta(days=365)
-        else:  # ALL
+        length = PERIOD_LENGTHS.get(period)
+        if length is None:
             return None
+        return func.now() - length
 
     def _map_context_type(
         self, schema_context_type: SchemaContextType | None
@@ -112,14 +226,29 @@ class StatsService:
         Raises:
             SongNotFoundError: If song not found.
         """
-        # Verify song exists and belongs to user
+        missing_key = f"{user_id}:{song_id}"
+        if _missing_songs.get(missing_key):
+            raise SongNotFoundError(f"Song not found: {song_id}")
+
+        # Bump play_count and last_played_at in the same statement that
+        # checks the song exists and belongs to the user
         result = await self.db.execute(
-            select(Song).where(Song.id == song_id, Song.owner_id == user_id)
+            update(Song)
+            .where(Song.id == song_id, Song.owner_id == user_id)
+            .values(
+                play_count=Song.play_count + 1,
+                last_played_at=datetime.now(UTC),
+            )
+            .returning(Song.genre)
         )
-        song = result.scalar_one_or_none()
-        if not song:
+        song = result.first()
+        if song is None:
+            _missing_songs.set(missing_key, True, MISSING_SONG_TTL)
             raise SongNotFoundError(f"Song not found: {song_id}")
 
+        if song.genre is not None:
+            await add_genre_plays(self.db, user_id, song.genre, 1)
+
         # Create listening history record
         history = ListeningHistory(
             user_id=user_id,
@@ -132,11 +261,6 @@ class StatsService:
             device_type=device_type,
         )
         self.db.add(history)
-
-        # Update song play_count and last_played_at
-        song.play_count += 1
-        song.last_played_at = datetime.now(UTC)
-
         await self.db.flush()
 
         # Invalidate cache for this user's stats
@@ -144,13 +268,121 @@ class StatsService:
 
         return history
 
+    async def record_plays_bulk(
+        self, user_id: UUID, plays: list[PlayImportItem]
+    ) -> int:
+        """Record many past play events at once, e.g. from an import.
+
+        History rows are written with COPY and song play counts are bumped
+        in one UPDATE, instead of one record_play round trip per event.
+
+        Args:
+            user_id: User UUID.
+            plays: Play events to record.
+
+        Returns:
+            Number of plays recorded.
+
+        Raises:
+            SongNotFoundError: If any song is not found; nothing is recorded.
+        """
+        if not plays:
+            return 0
+
+        song_ids = {play.song_id for play in plays}
+        result = await self.db.execute(
+            select(Song.id, Song.genre).where(
+                Song.owner_id == user_id, Song.id.in_(song_ids)
+            )
+        )
+        genres = {row.id: row.genre for row in result}
+        missing = song_ids - genres.keys()
+        if missing:
+            raise SongNotFoundError(f"Song not found: {next(iter(missing))}")
+
+        # COPY runs on the session's connection, inside its transaction;
+        # flush first so it sees everything pending in the session
+        await self.db.flush()
+        records = [
+            (
+                uuid4(),
+                user_id,
+                play.song_id,
+                play.played_at,
+                play.duration_listened_seconds,
+                play.completed,
+                False,
+                # Stored by member name, like the ORM does
+                play.context_type.name if play.context_type else None,
+                play.context_id,
+                play.device_type,
+            )
+            for play in plays
+        ]
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(  # type: ignore[union-attr]
+            ListeningHistory.__tablename__,
+            records=records,
+            columns=[
+                "id",
+                "user_id",
+                "song_id",
+                "played_at",
+                "played_duration_seconds",
+                "completed",
+                "skipped",
+                "context_type",
+                "context_id",
+                "device_type",
+            ],
+        )
+
+        # Play counts and last played times per song, applied in one UPDATE
+        song_plays: dict[UUID, tuple[int, datetime]] = {}
+        genre_plays: dict[str, int] = {}
+        for play in plays:
+            count, last_played_at = song_plays.get(play.song_id, (0, play.played_at))
+            song_plays[play.song_id] = (count + 1, max(last_played_at, play.played_at))
+            genre = genres[play.song_id]
+            if genre is not None:
+                genre_plays[genre] = genre_plays.get(genre, 0) + 1
+
+        counts = values(
+            column("song_id", PG_UUID(as_uuid=True)),
+            column("plays", Integer),
+            column("last_played_at", DateTime(timezone=True)),
+            name="counts",
+        ).data([(song_id, *counted) for song_id, counted in song_plays.items()])
+        await self.db.execute(
+            update(Song)
+            .where(Song.id == counts.c.song_id)
+            .values(
+                play_count=Song.play_count + counts.c.plays,
+                last_played_at=func.greatest(
+                    Song.last_played_at, counts.c.last_played_at
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        for genre, count in genre_plays.items():
+            await add_genre_plays(self.db, user_id, genre, count)
+
+        await self._invalidate_user_cache(user_id)
+
+        return len(plays)
+
     async def _invalidate_user_cache(self, user_id: UUID) -> None:
         """Invalidate all cached stats for a user.
 
+        Cached recommendations embed play counts, so they are dropped as well.
+
         Args:
             user_id: User UUID.
         """
-        await self.cache.delete_pattern(f"stats:{user_id}:*")
+        await self.cache.delete(_stats_cache_key(user_id))
+        await self.cache.delete_pattern(f"recommendations:{user_id}:*")
 
     async def get_history(
         self,
@@ -172,41 +404,37 @@ class StatsService:
         Returns:
             Tuple of (history list, total count).
         """
-        # Base query with song relationship loaded
-        query = (
-            select(ListeningHistory)
-            .options(selectinload(ListeningHistory.song))
-            .where(ListeningHistory.user_id == user_id)
-        )
-
-        # Apply date filters
+        filters = [ListeningHistory.user_id == user_id]
         if from_date:
-            query = query.where(ListeningHistory.played_at >= from_date)
+            filters.append(ListeningHistory.played_at >= from_date)
         if to_date:
-            query = query.where(ListeningHistory.played_at <= to_date)
+            filters.append(ListeningHistory.played_at <= to_date)
 
-        # Count total
-        count_query = (
-            select(func.count())
-            .select_from(ListeningHistory)
-            .where(ListeningHistory.user_id == user_id)
-        )
-        if from_date:
-            count_query = count_query.where(ListeningHistory.played_at >= from_date)
-        if to_date:
-            count_query = count_query.where(ListeningHistory.played_at <= to_date)
-
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
-
-        # Apply sorting and pagination
-        query = query.order_by(ListeningHistory.played_at.desc())
+        # Page and total in one query; only the song relationship may load,
+        # any other lazy load raises instead of silently querying per row
         offset = (page - 1) * limit
-        query = query.offset(offset).limit(limit)
-
-        # Execute query
+        query = (
+            select(ListeningHistory, func.count().over().label("total"))
+            .options(selectinload(ListeningHistory.song), raiseload("*"))
+            .where(*filters)
+            .order_by(ListeningHistory.played_at.desc())
+            .offset(offset)
+            .limit(limit)
+        )
         result = await self.db.execute(query)
-        history = list(result.scalars().all())
+        rows = result.all()
+        history = [row.ListeningHistory for row in rows]
+
+        if rows:
+            total = rows[0].total
+        elif offset:
+            # Page past the end: the window total is not available
+            count_result = await self.db.execute(
+                select(func.count()).select_from(ListeningHistory).where(*filters)
+            )
+            total = count_result.scalar() or 0
+        else:
+            total = 0
 
         return history, total
 
@@ -224,132 +452,154 @@ class StatsService:
         Returns:
             Statistics overview dictionary.
         """
-        # Try to get from cache
-        cache_key = f"stats:{user_id}:overview:{period.value}"
-        cached = await self.cache.get(cache_key)
-        if cached is not None:
-            # Reconstruct the response objects from cached data
-            cached["listening_by_hour"] = [
-                HourlyListeningCount(**h) for h in cached.get("listening_by_hour", [])
-            ]
-            cached["listening_by_day"] = [
-                DailyListeningCount(**d) for d in cached.get("listening_by_day", [])
-            ]
-            return dict(cached)
+        # Served stale for a short while after expiry, so that only one
+        # request recomputes an expired overview
+        overview = await self.cache.get_or_set_swr(
+            _stats_cache_key(user_id),
+            lambda: self._compute_overview(user_id, period),
+            CACHE_TTL_OVERVIEW,
+            CACHE_STALE_TTL_OVERVIEW,
+            field=f"overview:{period.value}",
+        )
+
+        # Reconstruct the response objects from cached data; the buckets were
+        # built from query results, so validating them again is wasted work
+        return {
+            **overview,
+            "listening_by_hour": [
+                HourlyListeningCount.model_construct(**h)
+                for h in overview["listening_by_hour"]
+            ],
+            "listening_by_day": [
+                DailyListeningCount.model_construct(**d)
+                for d in overview["listening_by_day"]
+            ],
+        }
+
+    async def _compute_overview(
+        self, user_id: UUID, period: StatsPeriod
+    ) -> dict[str, Any]:
+        """Compute the statistics overview from the database.
 
+        Args:
+            user_id: User UUID.
+            period: Statistics period.
+
+        Returns:
+            JSON serializable statistics overview dictionary.
+        """
         period_start = self._get_period_start(period)
 
-        # Base filter for period
-        base_filter = [ListeningHistory.user_id == user_id]
-        if period_start:
-            base_filter.append(ListeningHistory.played_at >= period_start)
-
-        # Total plays
-        total_plays_query = select(func.count()).select_from(ListeningHistory)
-        for f in base_filter:
-            total_plays_query = total_plays_query.where(f)
-        result = await self.db.execute(total_plays_query)
-        total_plays = result.scalar() or 0
-
-        # Total duration
-        total_duration_query = select(
-            func.coalesce(func.sum(ListeningHistory.played_duration_seconds), 0)
-        ).select_from(ListeningHistory)
-        for f in base_filter:
-            total_duration_query = total_duration_query.where(f)
-        result = await self.db.execute(total_duration_query)
-        total_duration_seconds = result.scalar() or 0
-
-        # Unique songs
-        unique_songs_query = select(
-            func.count(distinct(ListeningHistory.song_id))
-        ).select_from(ListeningHistory)
-        for f in base_filter:
-            unique_songs_query = unique_songs_query.where(f)
-        result = await self.db.execute(unique_songs_query)
-        unique_songs = result.scalar() or 0
-
-        # Unique artists (join with songs)
-        unique_artists_query = (
-            select(func.count(distinct(Song.artist)))
-            .select_from(ListeningHistory)
-            .join(Song, ListeningHistory.song_id == Song.id)
-        )
-        for f in base_filter:
-            unique_artists_query = unique_artists_query.where(f)
-        result = await self.db.execute(unique_artists_query)
-        unique_artists = result.scalar() or 0
-
-        # Most played genre
-        genre_query = (
-            select(Song.genre, func.count().label("cnt"))
+        # Base filter for period, built once and shared by the queries below
+        conditions = [ListeningHistory.user_id == user_id]
+        if period_start is not None:
+            conditions.append(ListeningHistory.played_at >= period_start)
+        base_filter = and_(*conditions)
+
+        # Most played genre, evaluated inside the totals query. All-time
+        # counts are kept up to date by record_play, so only bounded periods
+        # aggregate the history
+        if period_start is None:
+            genre_query = (
+                select(UserGenrePlays.genre)
+                .where(UserGenrePlays.user_id == user_id, UserGenrePlays.play_count > 0)
+                .order_by(UserGenrePlays.play_count.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+        else:
+            genre_query = (
+                select(Song.genre)
+                .select_from(ListeningHistory)
+                .join(Song, ListeningHistory.song_id == Song.id)
+                .where(base_filter, Song.genre.isnot(None))
+                .group_by(Song.genre)
+                .order_by(func.count().desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+
+        # Totals in a single round trip; every history row has a song, so the
+        # join does not change the counts
+        totals_query = (
+            select(
+                func.count().label("total_plays"),
+                func.coalesce(
+                    func.sum(ListeningHistory.played_duration_seconds), 0
+                ).label("total_duration_seconds"),
+                func.count(distinct(ListeningHistory.song_id)).label("unique_songs"),
+                func.count(distinct(Song.artist)).label("unique_artists"),
+                genre_query.label("most_played_genre"),
+            )
             .select_from(ListeningHistory)
             .join(Song, ListeningHistory.song_id == Song.id)
-            .where(Song.genre.isnot(None))
-        )
-        for f in base_filter:
-            genre_query = genre_query.where(f)
-        genre_query = (
-            genre_query.group_by(Song.genre).order_by(func.count().desc()).limit(1)
+            .where(base_filter)
         )
-        result = await self.db.execute(genre_query)
-        genre_row = result.first()
-        most_played_genre = genre_row[0] if genre_row else None
-
-        # Listening by hour
-        hour_query = select(
-            func.extract("hour", ListeningHistory.played_at).label("hour"),
-            func.count().label("cnt"),
-        ).select_from(ListeningHistory)
-        for f in base_filter:
-            hour_query = hour_query.where(f)
-        hour_query = hour_query.group_by("hour").order_by("hour")
-        result = await self.db.execute(hour_query)
-        hourly_rows = result.fetchall()
-        listening_by_hour = [
-            HourlyListeningCount(hour=int(row[0]), count=row[1]) for row in hourly_rows
-        ]
-
-        # Listening by day (last 7/30 days depending on period)
+        result = await self.db.execute(totals_query)
+        totals = result.one()
+        total_plays = totals.total_plays
+        total_duration_seconds = totals.total_duration_seconds
+        unique_songs = totals.unique_songs
+        unique_artists = totals.unique_artists
+        most_played_genre = totals.most_played_genre
+
+        # Listening by hour and by day (last 7/30 days depending on period),
+        # fetched together as (kind, bucket, count) rows
         days_to_show = 7 if period in (StatsPeriod.DAY, StatsPeriod.WEEK) else 30
-        day_cutoff = datetime.now(UTC) - timedelta(days=days_to_show)
-
+        utc = literal_column("'UTC'", String)
+        day_unit = literal_column("'day'", String)
+        today = func.date_trunc(day_unit, func.timezone(utc, func.now()))
+        day_cutoff = today - timedelta(days=days_to_show)
+
+        # Buckets are UTC days and hours. Unlike date(played_at), the day
+        # expression is immutable, so ix_listening_history_user_day serves
+        # both the cutoff filter and the grouping. The constants are rendered
+        # inline: as bound parameters a generic plan can't match the index
+        played_at_utc = func.timezone(utc, ListeningHistory.played_at)
+        hour = cast(func.extract("hour", played_at_utc), Integer)
+        day = func.date_trunc(day_unit, played_at_utc, type_=DateTime())
+        hour_query = (
+            select(
+                literal("hour").label("kind"),
+                cast(hour, String).label("bucket"),
+                func.count().label("cnt"),
+            )
+            .where(base_filter)
+            .group_by(hour)
+        )
         day_query = (
             select(
-                func.date(ListeningHistory.played_at).label("day"),
+                literal("day").label("kind"),
+                func.to_char(day, "YYYY-MM-DD").label("bucket"),
                 func.count().label("cnt"),
             )
-            .select_from(ListeningHistory)
-            .where(ListeningHistory.user_id == user_id)
-            .where(ListeningHistory.played_at >= day_cutoff)
+            .where(ListeningHistory.user_id == user_id, day >= day_cutoff)
+            .group_by(day)
         )
-        day_query = day_query.group_by("day").order_by("day")
-        result = await self.db.execute(day_query)
-        daily_rows = result.fetchall()
-        listening_by_day = [
-            DailyListeningCount(day=str(row[0]), count=row[1]) for row in daily_rows
-        ]
+        result = await self.db.execute(union_all(hour_query, day_query))
 
-        result_data = {
+        hours: dict[int, int] = {}
+        days: dict[str, int] = {}
+        for kind, bucket, count in result.all():
+            if kind == "hour":
+                hours[int(bucket)] = count
+            else:
+                days[bucket] = count
+
+        return {
             "total_plays": total_plays,
             "total_duration_seconds": total_duration_seconds,
             "unique_songs": unique_songs,
             "unique_artists": unique_artists,
             "most_played_genre": most_played_genre,
-            "listening_by_hour": listening_by_hour,
-            "listening_by_day": listening_by_day,
+            "listening_by_hour": [
+                {"hour": hour, "count": hours[hour]} for hour in sorted(hours)
+            ],
+            "listening_by_day": [
+                {"day": day, "count": days[day]} for day in sorted(days)
+            ],
         }
 
-        # Cache the result
-        cache_data = {
-            **result_data,
-            "listening_by_hour": [h.model_dump() for h in listening_by_hour],
-            "listening_by_day": [d.model_dump() for d in listening_by_day],
-        }
-        await self.cache.set(cache_key, cache_data, CACHE_TTL_OVERVIEW)
-
-        return result_data
-
     async def get_top_songs(
         self,
         user_id: UUID,
@@ -366,24 +616,51 @@ class StatsService:
         Returns:
             List of top songs with play counts.
         """
+        # Try to get from cache
+        cache_key = _stats_cache_key(user_id)
+        cache_field = f"top_songs:{period.value}:{limit}"
+        cached = await self.cache.hget(cache_key, cache_field)
+        if cached is not None:
+            return [
+                {
+                    "song": song_from_cache(item["song"]),
+                    "play_count": item["play_count"],
+                }
+                for item in cached
+            ]
+
         period_start = self._get_period_start(period)
 
-        query = (
-            select(Song, func.count().label("play_count"))
-            .select_from(ListeningHistory)
-            .join(Song, ListeningHistory.song_id == Song.id)
-            .where(ListeningHistory.user_id == user_id)
+        # Project only the columns the response renders; file paths, lyrics
+        # and the rest of the row are never needed here. Built as a lambda
+        # statement so the select() is constructed once per code path, with
+        # user_id, period_start and limit picked up as bound parameters
+        query = lambda_stmt(
+            lambda: (
+                select(*TOP_SONG_COLUMNS, func.count().label("plays"))
+                .select_from(ListeningHistory)
+                .join(Song, ListeningHistory.song_id == Song.id)
+                .where(ListeningHistory.user_id == user_id)
+            )
         )
 
-        if period_start:
-            query = query.where(ListeningHistory.played_at >= period_start)
+        if period_start is not None:
+            query += lambda s: s.where(ListeningHistory.played_at >= period_start)
 
-        query = query.group_by(Song.id).order_by(func.count().desc()).limit(limit)
+        query += lambda s: (
+            s.group_by(Song.id).order_by(func.count().desc()).limit(limit)
+        )
 
         result = await self.db.execute(query)
         rows = result.fetchall()
 
-        return [{"song": row[0], "play_count": row[1]} for row in rows]
+        # Cache the result
+        cache_data = [
+            {"song": song_to_cache(row), "play_count": row.plays} for row in rows
+        ]
+        await self.cache.hset(cache_key, cache_field, cache_data, CACHE_TTL_TOP_SONGS)
+
+        return [{"song": row, "play_count": row.plays} for row in rows]
 
     async def get_top_artists(
         self,
@@ -401,56 +678,90 @@ class StatsService:
         Returns:
             List of top artists with play counts and their songs.
         """
+        # Try to get from cache
+        cache_key = _stats_cache_key(user_id)
+        cache_field = f"top_artists:{period.value}:{limit}"
+        cached = await self.cache.hget(cache_key, cache_field)
+        if cached is not None:
+            return [
+                {**item, "songs": [song_from_cache(s) for s in item["songs"]]}
+                for item in cached
+            ]
+
         period_start = self._get_period_start(period)
 
-        # Get top artists with play counts
-        query = (
-            select(Song.artist, func.count().label("play_count"))
+        # Plays per song, with its artist's total and its rank within the artist
+        song_plays = (
+            select(
+                Song.artist.label("artist"),
+                Song.id.label("song_id"),
+                func.count().label("plays"),
+            )
             .select_from(ListeningHistory)
             .join(Song, ListeningHistory.song_id == Song.id)
             .where(ListeningHistory.user_id == user_id)
             .where(Song.artist.isnot(None))
         )
-
-        if period_start:
-            query = query.where(ListeningHistory.played_at >= period_start)
-
-        query = query.group_by(Song.artist).order_by(func.count().desc()).limit(limit)
-
-        result = await self.db.execute(query)
-        artist_rows = result.fetchall()
-
-        # For each artist, get their songs
-        top_artists = []
-        for artist_row in artist_rows:
-            artist_name = artist_row[0]
-            play_count = artist_row[1]
-
-            # Get songs for this artist (ordered by play count in the period)
-            songs_query = (
-                select(Song, func.count().label("song_plays"))
-                .select_from(ListeningHistory)
-                .join(Song, ListeningHistory.song_id == Song.id)
-                .where(ListeningHistory.user_id == user_id)
-                .where(Song.artist == artist_name)
+        if period_start is not None:
+            song_plays = song_plays.where(ListeningHistory.played_at >= period_start)
+        song_plays_sq = song_plays.group_by(Song.artist, Song.id).subquery()
+
+        ranked = select(
+            song_plays_sq,
+            func.sum(song_plays_sq.c.plays)
+            .over(partition_by=song_plays_sq.c.artist)
+            .label("artist_plays"),
+            func.row_number()
+            .over(
+                partition_by=song_plays_sq.c.artist,
+                order_by=song_plays_sq.c.plays.desc(),
             )
-            if period_start:
-                songs_query = songs_query.where(
-                    ListeningHistory.played_at >= period_start
-                )
-            songs_query = (
-                songs_query.group_by(Song.id).order_by(func.count().desc()).limit(5)
+            .label("song_rank"),
+        ).subquery()
+
+        # Rank artists by their total plays, then keep the top artists and
+        # their top 5 songs in the same query
+        artist_ranked = select(
+            ranked,
+            func.dense_rank()
+            .over(order_by=(ranked.c.artist_plays.desc(), ranked.c.artist))
+            .label("artist_rank"),
+        ).subquery()
+
+        result = await self.db.execute(
+            select(Song, artist_ranked.c.artist, artist_ranked.c.artist_plays)
+            .join(artist_ranked, Song.id == artist_ranked.c.song_id)
+            .where(
+                artist_ranked.c.song_rank <= 5,
+                artist_ranked.c.artist_rank <= limit,
             )
+            .order_by(artist_ranked.c.artist_rank, artist_ranked.c.song_rank)
+        )
 
-            songs_result = await self.db.execute(songs_query)
-            songs = [row[0] for row in songs_result.fetchall()]
+        play_counts: dict[str, int] = {}
+        songs_by_artist: dict[str, list[Song]] = {}
+        for song, artist_name, artist_plays in result.all():
+            play_counts[artist_name] = int(artist_plays)
+            songs_by_artist.setdefault(artist_name, []).append(song)
+
+        top_artists: list[dict[str, object]] = [
+            {
+                "artist": artist_name,
+                "play_count": play_count,
+                "songs": songs_by_artist[artist_name],
+            }
+            for artist_name, play_count in play_counts.items()
+        ]
 
-            top_artists.append(
-                {
-                    "artist": artist_name,
-                    "play_count": play_count,
-                    "songs": songs,
-                }
-            )
+        # Cache the result
+        cache_data = [
+            {
+                "artist": artist_name,
+                "play_count": play_count,
+                "songs": [song_to_cache(s) for s in songs_by_artist[artist_name]],
+            }
+            for artist_name, play_count in play_counts.items()
+        ]
+        await self.cache.hset(cache_key, cache_field, cache_data, CACHE_TTL_TOP_ARTISTS)
 
         return top_artists
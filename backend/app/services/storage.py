@@ -1,7 +1,9 @@
 """File storage service for managing audio files and cover art."""
 
+import builtins
 import os
 import uuid
+from collections.abc import AsyncIterator
 from pathlib import Path
 from typing import IO
 
@@ -35,6 +37,12 @@ EXTENSION_TO_FORMAT = {
     ".aac": "m4a",
 }
 
+# Bytes copied per read when saving uploads
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+# Bytes read per chunk when streaming files
+STREAM_CHUNK_SIZE = 64 * 1024  # 64 KiB
+
 # MIME types for streaming
 FORMAT_MIME_TYPES = {
     "mp3": "audio/mpeg",
@@ -45,6 +53,11 @@ FORMAT_MIME_TYPES = {
 }
 
 
+# Directories already created by this process, so repeated uploads by the
+# same owner skip the makedirs syscalls
+_created_directories: set[Path] = set()
+
+
 class StorageError(Exception):
     """Base exception for storage errors."""
 
@@ -80,6 +93,17 @@ class StorageService:
         await aiofiles.os.makedirs(self.songs_dir, exist_ok=True)
         await aiofiles.os.makedirs(self.covers_dir, exist_ok=True)
 
+    async def _ensure_directory(self, directory: Path) -> None:
+        """Create a directory and its parents, once per process.
+
+        Args:
+            directory: Directory to create.
+        """
+        if directory in _created_directories:
+            return
+        await aiofiles.os.makedirs(directory, exist_ok=True)
+        _created_directories.add(directory)
+
     def get_format_from_content_type(self, content_type: str | None) -> str | None:
         """Get file format from content type.
 
@@ -138,8 +162,6 @@ class StorageService:
             UnsupportedFormatError: If file format is not supported.
             FileTooLargeError: If file exceeds size limit.
         """
-        await self.ensure_directories()
-
         # Determine file format
         file_format = self.get_format_from_content_type(
             content_type
@@ -156,21 +178,23 @@ class StorageService:
         file_path = self.songs_dir / safe_filename
 
         # Ensure owner directory exists
-        await aiofiles.os.makedirs(file_path.parent, exist_ok=True)
+        await self._ensure_directory(file_path.parent)
 
-        # Read and save file
-        content = file.read()
-        file_size = len(content)
+        # Copy the file in chunks so an upload is never held in memory whole
+        file_size = 0
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > self.max_size_bytes:
+                    break
+                await f.write(chunk)
 
         if file_size > self.max_size_bytes:
+            await self.delete_file(str(file_path))
             raise FileTooLargeError(
-                f"File size {file_size} bytes exceeds limit of "
-                f"{settings.MAX_UPLOAD_SIZE_MB} MB"
+                f"File size exceeds limit of {settings.MAX_UPLOAD_SIZE_MB} MB"
             )
 
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(content)
-
         return str(file_path), file_format, file_size
 
     async def save_cover_art(
@@ -189,14 +213,12 @@ class StorageService:
         Returns:
             Path to saved cover art.
         """
-        await self.ensure_directories()
-
         unique_id = uuid.uuid4()
         safe_filename = f"{owner_id}/{unique_id}.{image_format}"
         file_path = self.covers_dir / safe_filename
 
         # Ensure owner directory exists
-        await aiofiles.os.makedirs(file_path.parent, exist_ok=True)
+        await self._ensure_directory(file_path.parent)
 
         async with aiofiles.open(file_path, "wb") as f:
             await f.write(data)
@@ -228,10 +250,10 @@ class StorageService:
         Raises:
             FileNotFoundError: If file doesn't exist.
         """
-        path = Path(file_path)
-        if not await aiofiles.os.path.exists(path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-        stat = await aiofiles.os.stat(path)
+        try:
+            stat = await aiofiles.os.stat(Path(file_path))
+        except builtins.FileNotFoundError as e:
+            raise FileNotFoundError(f"File not found: {file_path}") from e
         return int(stat.st_size)
 
     async def read_file_range(
@@ -253,15 +275,47 @@ class StorageService:
         Raises:
             FileNotFoundError: If file doesn't exist.
         """
-        path = Path(file_path)
-        if not await aiofiles.os.path.exists(path):
-            raise FileNotFoundError(f"File not found: {file_path}")
+        try:
+            async with aiofiles.open(Path(file_path), "rb") as f:
+                await f.seek(start)
+                if end is None:
+                    return bytes(await f.read())
+                return bytes(await f.read(end - start))
+        except builtins.FileNotFoundError as e:
+            raise FileNotFoundError(f"File not found: {file_path}") from e
+
+    async def iter_file_range(
+        self,
+        file_path: str,
+        start: int,
+        end: int | None = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """Read a range of bytes from a file in chunks.
 
-        async with aiofiles.open(path, "rb") as f:
+        The file is opened lazily, once iteration starts, so check that it
+        exists (e.g. with get_file_size) before handing this to a response.
+
+        Args:
+            file_path: Path to file.
+            start: Start byte position.
+            end: End byte position (exclusive). If None, read to end.
+            chunk_size: Maximum number of bytes per chunk.
+
+        Yields:
+            Consecutive chunks of the requested range.
+        """
+        async with aiofiles.open(file_path, "rb") as f:
             await f.seek(start)
-            if end is None:
-                return bytes(await f.read())
-            return bytes(await f.read(end - start))
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = bytes(await f.read(size))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
 
     async def read_file(self, file_path: str) -> bytes:
         """Read entire file content.
@@ -275,12 +329,11 @@ class StorageService:
         Raises:
             FileNotFoundError: If file doesn't exist.
         """
-        path = Path(file_path)
-        if not await aiofiles.os.path.exists(path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-
-        async with aiofiles.open(path, "rb") as f:
-            return bytes(await f.read())
+        try:
+            async with aiofiles.open(Path(file_path), "rb") as f:
+                return bytes(await f.read())
+        except builtins.FileNotFoundError as e:
+            raise FileNotFoundError(f"File not found: {file_path}") from e
 
     def file_exists(self, file_path: str) -> bool:
         """Check if file exists (sync version for convenience).
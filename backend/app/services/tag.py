@@ -1,14 +1,21 @@
 """Tag service with business logic for tag management."""
 
+from datetime import datetime
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Select, and_, delete, exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, raiseload, selectinload
 
 from app.models.song import Song
 from app.models.tag import SongTag, Tag
 from app.schemas.tag import TagCreate, TagUpdate
+from app.services.cache import CacheService, get_cache_service
+
+# Cache TTL in seconds for per-owner tag lists
+CACHE_TTL_TAGS = 300
 
 
 class TagServiceError(Exception):
@@ -35,16 +42,100 @@ class TagNotOnSongError(TagServiceError):
     """Raised when tag is not on song."""
 
 
+def _tags_cache_key(owner_id: UUID) -> str:
+    """Build the cache key for a user's tag list.
+
+    Args:
+        owner_id: Owner UUID.
+
+    Returns:
+        Cache key.
+    """
+    return f"tags:{owner_id}"
+
+
+def _tag_to_cache(tag: Tag) -> dict[str, Any]:
+    """Serialize a tag into a JSON-friendly cache payload.
+
+    Args:
+        tag: Tag to serialize.
+
+    Returns:
+        Dictionary with the fields needed to render the tag.
+    """
+    return {
+        "id": str(tag.id),
+        "owner_id": str(tag.owner_id),
+        "name": tag.name,
+        "color": tag.color,
+        "created_at": tag.created_at.isoformat(),
+    }
+
+
+def _tag_from_cache(data: dict[str, Any]) -> Tag:
+    """Rebuild a detached tag from a cache payload.
+
+    Args:
+        data: Dictionary produced by _tag_to_cache.
+
+    Returns:
+        Transient Tag instance, not attached to any session.
+    """
+    return Tag(
+        id=UUID(data["id"]),
+        owner_id=UUID(data["owner_id"]),
+        name=data["name"],
+        color=data["color"],
+        created_at=datetime.fromisoformat(data["created_at"]),
+    )
+
+
+def _song_with_tags_query(song_id: UUID, owner_id: UUID) -> Select[Song]:
+    """Build the query loading a song with its tags.
+
+    Args:
+        song_id: Song UUID.
+        owner_id: Owner UUID.
+
+    Returns:
+        Select statement for the song.
+    """
+    return (
+        select(Song)
+        .where(Song.id == song_id, Song.owner_id == owner_id)
+        .options(
+            selectinload(Song.song_tags).options(
+                selectinload(SongTag.tag), raiseload("*")
+            ),
+            raiseload("*"),
+        )
+    )
+
+
 class TagService:
     """Service for managing tags."""
 
-    def __init__(self, db: AsyncSession) -> None:
+    def __init__(
+        self,
+        db: AsyncSession,
+        cache: CacheService | None = None,
+    ) -> None:
         """Initialize tag service.
 
         Args:
             db: Database session.
+            cache: Cache service for Redis caching. If None, uses global instance.
         """
         self.db = db
+        self.cache = cache or get_cache_service()
+
+    async def _invalidate_tags_cache(self, owner_id: UUID) -> None:
+        """Invalidate the cached tag list of a user.
+
+        Args:
+            owner_id: Owner UUID.
+        """
+        await self.cache.delete(_tags_cache_key(owner_id))
 
     async def get_tag_by_id(self, tag_id: UUID, owner_id: UUID) -> Tag | None:
         """Get a tag by ID.
@@ -85,10 +176,21 @@ class TagService:
         Returns:
             List of tags.
         """
+        # Tag lists are read by every tag picker and rarely change
+        cache_key = _tags_cache_key(owner_id)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return [_tag_from_cache(item) for item in cached]
+
         result = await self.db.execute(
             select(Tag).where(Tag.owner_id == owner_id).order_by(Tag.name.asc())
         )
-        return list(result.scalars().all())
+        tags = list(result.scalars().all())
+
+        await self.cache.set(
+            cache_key, [_tag_to_cache(tag) for tag in tags], CACHE_TTL_TAGS
+        )
+        return tags
 
     async def create_tag(self, owner_id: UUID, data: TagCreate) -> Tag:
         """Create a new tag.
@@ -103,18 +205,19 @@ class TagService:
         Raises:
             TagAlreadyExistsError: If tag with name already exists.
         """
-        # Check for existing tag with same name
-        existing = await self.get_tag_by_name(data.name, owner_id)
-        if existing:
+        # Conflict detection and insert in one atomic statement; a duplicate
+        # name returns no row instead of raising
+        result = await self.db.execute(
+            insert(Tag)
+            .values(owner_id=owner_id, name=data.name, color=data.color)
+            .on_conflict_do_nothing(index_elements=[Tag.owner_id, Tag.name])
+            .returning(Tag)
+        )
+        tag = result.scalar_one_or_none()
+        if tag is None:
             raise TagAlreadyExistsError(f"Tag with name '{data.name}' already exists")
 
-        tag = Tag(
-            owner_id=owner_id,
-            name=data.name,
-            color=data.color,
-        )
-        self.db.add(tag)
-        await self.db.flush()
+        await self._invalidate_tags_cache(owner_id)
         return tag
 
     async def update_tag(self, tag_id: UUID, owner_id: UUID, data: TagUpdate) -> Tag:
@@ -132,23 +235,39 @@ class TagService:
             TagNotFoundError: If tag not found.
             TagAlreadyExistsError: If new name conflicts with existing tag.
         """
-        tag = await self.get_tag_by_id(tag_id, owner_id)
-        if not tag:
-            raise TagNotFoundError(f"Tag not found: {tag_id}")
-
-        # Check for name conflict if name is being updated
-        if data.name and data.name != tag.name:
-            existing = await self.get_tag_by_name(data.name, owner_id)
-            if existing:
-                raise TagAlreadyExistsError(
-                    f"Tag with name '{data.name}' already exists"
-                )
-
         update_dict = data.model_dump(exclude_unset=True)
-        for field, value in update_dict.items():
-            setattr(tag, field, value)
+        if not update_dict:
+            tag = await self.get_tag_by_id(tag_id, owner_id)
+            if not tag:
+                raise TagNotFoundError(f"Tag not found: {tag_id}")
+            return tag
+
+        # Update and return the tag in one statement, skipping it when another
+        # tag of the user already has the new name
+        query = (
+            update(Tag)
+            .where(Tag.id == tag_id, Tag.owner_id == owner_id)
+            .values(**update_dict)
+            .returning(Tag)
+        )
+        if data.name:
+            other = aliased(Tag)
+            query = query.where(
+                ~exists().where(
+                    other.owner_id == owner_id,
+                    other.name == data.name,
+                    other.id != tag_id,
+                )
+            )
+        result = await self.db.execute(query)
+        tag = result.scalar_one_or_none()
+        if tag is None:
+            # Tell a missing tag from a name conflict only on this error path
+            if await self.get_tag_by_id(tag_id, owner_id) is None:
+                raise TagNotFoundError(f"Tag not found: {tag_id}")
+            raise TagAlreadyExistsError(f"Tag with name '{data.name}' already exists")
 
-        await self.db.flush()
+        await self._invalidate_tags_cache(owner_id)
         return tag
 
     async def delete_tag(self, tag_id: UUID, owner_id: UUID) -> None:
@@ -161,27 +280,16 @@ class TagService:
         Raises:
             TagNotFoundError: If tag not found.
         """
-        tag = await self.get_tag_by_id(tag_id, owner_id)
-        if not tag:
-            raise TagNotFoundError(f"Tag not found: {tag_id}")
-
-        await self.db.delete(tag)
-        await self.db.flush()
-
-    async def _get_song(self, song_id: UUID, owner_id: UUID) -> Song | None:
-        """Get a song by ID.
-
-        Args:
-            song_id: Song UUID.
-            owner_id: Owner UUID.
-
-        Returns:
-            Song if found, None otherwise.
-        """
+        # A single DELETE; song_tags rows go with it via ON DELETE CASCADE
         result = await self.db.execute(
-            select(Song).where(Song.id == song_id, Song.owner_id == owner_id)
+            delete(Tag)
+            .where(Tag.id == tag_id, Tag.owner_id == owner_id)
+            .returning(Tag.id)
         )
-        return result.scalar_one_or_none()
+        if result.scalar_one_or_none() is None:
+            raise TagNotFoundError(f"Tag not found: {tag_id}")
+
+        await self._invalidate_tags_cache(owner_id)
 
     async def _get_song_with_tags(
         self, song_id: UUID, owner_id: UUID, *, refresh: bool = False
@@ -196,34 +304,12 @@ class TagService:
         Returns:
             Song with tags if found, None otherwise.
         """
-        query = (
-            select(Song)
-            .where(Song.id == song_id, Song.owner_id == owner_id)
-            .options(selectinload(Song.song_tags).selectinload(SongTag.tag))
-        )
+        query = _song_with_tags_query(song_id, owner_id)
         if refresh:
             query = query.execution_options(populate_existing=True)
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
-    async def _get_song_tag(self, song_id: UUID, tag_id: UUID) -> SongTag | None:
-        """Get a song-tag association.
-
-        Args:
-            song_id: Song UUID.
-            tag_id: Tag UUID.
-
-        Returns:
-            SongTag if found, None otherwise.
-        """
-        result = await self.db.execute(
-            select(SongTag).where(
-                SongTag.song_id == song_id,
-                SongTag.tag_id == tag_id,
-            )
-        )
-        return result.scalar_one_or_none()
-
     async def add_tag_to_song(
         self,
         song_id: UUID,
@@ -245,25 +331,32 @@ class TagService:
             TagNotFoundError: If tag not found.
             TagAlreadyOnSongError: If tag already on song.
         """
-        song = await self._get_song(song_id, owner_id)
-        if not song:
+        # Load the song with its tags and the tag to add in one statement;
+        # the updated collection is returned as is instead of being read back
+        # after the flush
+        result = await self.db.execute(
+            _song_with_tags_query(song_id, owner_id)
+            .add_columns(Tag)
+            .outerjoin(Tag, and_(Tag.id == tag_id, Tag.owner_id == Song.owner_id))
+            .execution_options(populate_existing=True)
+        )
+        row = result.one_or_none()
+        if row is None:
             raise SongNotFoundError(f"Song not found: {song_id}")
 
-        tag = await self.get_tag_by_id(tag_id, owner_id)
-        if not tag:
+        song: Song = row[0]
+        tag: Tag | None = row[1]
+        if tag is None:
             raise TagNotFoundError(f"Tag not found: {tag_id}")
 
         # Check if tag is already on song
-        existing = await self._get_song_tag(song_id, tag_id)
-        if existing:
+        if any(song_tag.tag_id == tag_id for song_tag in song.song_tags):
             raise TagAlreadyOnSongError(f"Tag {tag_id} is already on song {song_id}")
 
-        song_tag = SongTag(song_id=song_id, tag_id=tag_id)
-        self.db.add(song_tag)
+        song.song_tags.append(SongTag(tag=tag))
         await self.db.flush()
 
-        # Fetch fresh data with refresh=True to bypass identity map cache
-        return await self._get_song_with_tags(song_id, owner_id, refresh=True)  # type: ignore
+        return song
 
     async def remove_tag_from_song(
         self,
@@ -285,19 +378,100 @@ class TagService:
             SongNotFoundError: If song not found.
             TagNotOnSongError: If tag not on song.
         """
-        song = await self._get_song(song_id, owner_id)
+        song = await self._get_song_with_tags(song_id, owner_id, refresh=True)
         if not song:
             raise SongNotFoundError(f"Song not found: {song_id}")
 
-        song_tag = await self._get_song_tag(song_id, tag_id)
+        song_tag = next(
+            (song_tag for song_tag in song.song_tags if song_tag.tag_id == tag_id),
+            None,
+        )
         if not song_tag:
             raise TagNotOnSongError(f"Tag {tag_id} is not on song {song_id}")
 
-        await self.db.delete(song_tag)
+        # Orphaned associations are deleted on flush
+        song.song_tags.remove(song_tag)
         await self.db.flush()
 
-        # Fetch fresh data with refresh=True to bypass identity map cache
-        return await self._get_song_with_tags(song_id, owner_id, refresh=True)  # type: ignore
+        return song
+
+    async def add_tags_to_song(
+        self,
+        song_id: UUID,
+        tag_ids: list[UUID],
+        owner_id: UUID,
+    ) -> Song:
+        """Add several tags to a song at once.
+
+        Tags already on the song are skipped, so the call is idempotent.
+
+        Args:
+            song_id: Song UUID.
+            tag_ids: Tag UUIDs.
+            owner_id: Owner UUID.
+
+        Returns:
+            Updated song with tags.
+
+        Raises:
+            SongNotFoundError: If song not found.
+            TagNotFoundError: If any of the tags is not found.
+        """
+        song = await self._get_song_with_tags(song_id, owner_id, refresh=True)
+        if not song:
+            raise SongNotFoundError(f"Song not found: {song_id}")
+
+        # Validate every tag in one query, keeping the requested order
+        requested = list(dict.fromkeys(tag_ids))
+        result = await self.db.execute(
+            select(Tag).where(Tag.id.in_(requested), Tag.owner_id == owner_id)
+        )
+        tags = {tag.id: tag for tag in result.scalars().all()}
+        missing = [tag_id for tag_id in requested if tag_id not in tags]
+        if missing:
+            raise TagNotFoundError(f"Tag not found: {missing[0]}")
+
+        # The new associations are inserted in a single batch on flush
+        existing = {song_tag.tag_id for song_tag in song.song_tags}
+        for tag_id in requested:
+            if tag_id not in existing:
+                song.song_tags.append(SongTag(tag=tags[tag_id]))
+        await self.db.flush()
+
+        return song
+
+    async def remove_tags_from_song(
+        self,
+        song_id: UUID,
+        tag_ids: list[UUID],
+        owner_id: UUID,
+    ) -> Song:
+        """Remove several tags from a song at once.
+
+        Tags that are not on the song are ignored, so the call is idempotent.
+
+        Args:
+            song_id: Song UUID.
+            tag_ids: Tag UUIDs.
+            owner_id: Owner UUID.
+
+        Returns:
+            Updated song with tags.
+
+        Raises:
+            SongNotFoundError: If song not found.
+        """
+        song = await self._get_song_with_tags(song_id, owner_id, refresh=True)
+        if not song:
+            raise SongNotFoundError(f"Song not found: {song_id}")
+
+        # Orphaned associations are deleted together on flush
+        removed = set(tag_ids)
+        for song_tag in [st for st in song.song_tags if st.tag_id in removed]:
+            song.song_tags.remove(song_tag)
+        await self.db.flush()
+
+        return song
 
     async def get_song_with_tags(self, song_id: UUID, owner_id: UUID) -> Song | None:
         """Get a song with its tags (public method).
@@ -332,26 +506,35 @@ class TagService:
         Raises:
             TagNotFoundError: If tag not found.
         """
-        tag = await self.get_tag_by_id(tag_id, owner_id)
-        if not tag:
-            raise TagNotFoundError(f"Tag not found: {tag_id}")
-
-        # Count total
-        count_result = await self.db.execute(
-            select(SongTag).where(SongTag.tag_id == tag_id)
-        )
-        total = len(count_result.scalars().all())
-
-        # Get songs
+        # Page and total in one query; joining the tag checks its owner
         offset = (page - 1) * limit
         result = await self.db.execute(
-            select(Song)
+            select(Song, func.count().over().label("total"))
             .join(SongTag, Song.id == SongTag.song_id)
-            .where(SongTag.tag_id == tag_id, Song.owner_id == owner_id)
+            .join(Tag, Tag.id == SongTag.tag_id)
+            .where(
+                SongTag.tag_id == tag_id,
+                Tag.owner_id == owner_id,
+                Song.owner_id == owner_id,
+            )
             .order_by(Song.title.asc())
             .offset(offset)
             .limit(limit)
         )
-        songs = list(result.scalars().all())
+        rows = result.all()
+        if rows:
+            return [row[0] for row in rows], rows[0].total
+
+        # An empty page is either an unknown tag, an empty tag or a page past
+        # the end, which the window count cannot tell apart
+        tag = await self.get_tag_by_id(tag_id, owner_id)
+        if not tag:
+            raise TagNotFoundError(f"Tag not found: {tag_id}")
 
-        return songs, total
+        count_result = await self.db.execute(
+            select(func.count())
+            .select_from(SongTag)
+            .join(Song, Song.id == SongTag.song_id)
+            .where(SongTag.tag_id == tag_id, Song.owner_id == owner_id)
+        )
+        return [], count_result.scalar_one()
@@ -1,9 +1,255 @@
 """Pytest configuration and fixtures."""
 
+import asyncio
+import os
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from functools import cache
+from uuid import UUID
+
 import pytest
+from fakeredis import FakeAsyncRedis
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import URL, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+# Cheapest bcrypt cost factor; must be set before the app settings load
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import cache as cache_module  # noqa: E402
+from app.services.cache import CacheService  # noqa: E402
+
+# Under pytest-xdist each worker gets its own database (test_gw0, test_gw1,
+# ...), so workers never share a schema
+BASE_TEST_DATABASE = os.getenv("POSTGRES_DB", "test")
+XDIST_WORKER = os.getenv("PYTEST_XDIST_WORKER")
+TEST_DATABASE = (
+    f"{BASE_TEST_DATABASE}_{XDIST_WORKER}" if XDIST_WORKER else BASE_TEST_DATABASE
+)
+
+# Fixed so the auth token can be signed once per run; every test rolls back
+# its user, so the id never collides
+TEST_USER_ID = UUID("00000000-0000-4000-8000-000000000001")
+
+
+def get_test_database_url(database: str) -> URL:
+    """Get database URL for testing."""
+    return URL.create(
+        "postgresql+asyncpg",
+        username=os.getenv("POSTGRES_USER", "test"),
+        password=os.getenv("POSTGRES_PASSWORD", "test"),
+        host=os.getenv("POSTGRES_HOST", "localhost"),
+        port=int(os.getenv("POSTGRES_PORT", "5432")),
+        database=database,
+    )
+
+
+def pytest_asyncio_loop_factories(config, item):
+    """Run the async tests on uvloop where it is installed.
+
+    uvloop comes with uvicorn[standard] everywhere except Windows.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
 
 
 @pytest.fixture(scope="session")
 def anyio_backend():
     """Use asyncio for async tests."""
     return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def worker_database() -> None:
+    """Create this xdist worker's database if it does not exist yet.
+
+    The database is left in place afterwards so later runs can reuse it.
+    """
+    if not XDIST_WORKER:
+        return
+
+    engine = create_async_engine(
+        get_test_database_url(BASE_TEST_DATABASE), isolation_level="AUTOCOMMIT"
+    )
+    try:
+        async with engine.connect() as conn:
+            # PostgreSQL has no CREATE DATABASE IF NOT EXISTS
+            exists = await conn.scalar(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                {"name": TEST_DATABASE},
+            )
+            if not exists:
+                await conn.execute(text(f'CREATE DATABASE "{TEST_DATABASE}"'))
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+async def engine(worker_database: None) -> AsyncIterator[AsyncEngine]:
+    """Create the test engine and schema once for the whole test run."""
+    engine = create_async_engine(
+        get_test_database_url(TEST_DATABASE),
+        # Tiny test queries never benefit from JIT compilation
+        connect_args={"server_settings": {"jit": "off"}},
+        # Each test holds exactly one connection, for its outer transaction
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db_session(engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
+    """Create a test database session rolled back after each test.
+
+    The session joins an outer transaction on a pooled connection; commits made
+    by the code under test only release a savepoint inside it.
+    """
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            autoflush=False,
+            join_transaction_mode="create_savepoint",
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await trans.rollback()
+
+
+@pytest.fixture(autouse=True)
+async def cache_service() -> AsyncIterator[CacheService]:
+    """Give each test its own empty in-memory cache.
+
+    Every test shares TEST_USER_ID, so per-user keys such as tags:{id} must
+    not survive from one test into the next, whether or not Redis is running.
+    """
+    service = CacheService(redis_client=FakeAsyncRedis(decode_responses=True))
+    cache_module._cache_service = service
+    yield service
+    await service.close()
+    cache_module._cache_service = None
+
+
+@pytest.fixture(scope="session")
+async def shared_client():
+    """Create one test client for the whole test run.
+
+    Test files wrap it in their own ``client`` fixture, which only sets the
+    dependency overrides each test needs.
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+async def client(
+    db_session: AsyncSession, shared_client: AsyncClient
+) -> AsyncIterator[AsyncClient]:
+    """Return the shared test client with the database dependency overridden."""
+
+    async def override_get_db():
+        try:
+            yield db_session
+            await db_session.commit()
+        except Exception:
+            await db_session.rollback()
+            raise
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    yield shared_client
+
+    app.dependency_overrides.pop(get_db, None)
+
+
+@cache
+def _cached_password_hash(password: str) -> str:
+    """Hash a password once per test run.
+
+    Reuses the salt across fixtures, which is fine for test users only.
+    """
+    return get_password_hash(password)
+
+
+@pytest.fixture(scope="session")
+def hash_password() -> Callable[[str], str]:
+    """Return a password hasher memoized for the whole test run."""
+    return _cached_password_hash
+
+
+@pytest.fixture
+async def test_user(
+    db_session: AsyncSession, hash_password: Callable[[str], str]
+) -> User:
+    """Create a test user."""
+    user = User(
+        id=TEST_USER_ID,
+        email="test@example.com",
+        username="testuser",
+        password_hash=hash_password("SecurePass123"),
+    )
+    db_session.add(user)
+    await db_session.flush()
+    return user
+
+
+@pytest.fixture(scope="session")
+def auth_token() -> str:
+    """Create auth token for the test user once for the whole test run."""
+    return create_access_token(str(TEST_USER_ID))
+
+
+@pytest.fixture
+def auth_headers(auth_token: str, test_user: User) -> dict[str, str]:
+    """Create auth headers; requesting test_user makes sure the user exists."""
+    return {"Authorization": f"Bearer {auth_token}"}
+
+
+@contextmanager
+def _capture_statements(session: AsyncSession) -> Iterator[list[str]]:
+    """Collect the SQL statements executed through a session's engine."""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def count_queries() -> Callable[[AsyncSession], AbstractContextManager[list[str]]]:
+    """Return a context manager listing the statements a session executes.
+
+    Used to pin query counts, e.g. ``with count_queries(db_session) as q: ...``
+    followed by ``assert len(q) == 1``.
+    """
+    return _capture_statements
@@ -1,10 +1,8 @@
 """Tests for authentication service and endpoints."""
 
-import os
-
 import pytest
-from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import (
     create_access_token,
@@ -13,9 +11,6 @@ from app.core.security import (
     get_password_hash,
     verify_password,
 )
-from app.db.base import Base
-from app.db.session import get_db
-from app.main import app
 from app.models.user import User
 from app.schemas.auth import UserCreate
 from app.services.auth import (
@@ -26,82 +21,6 @@ from app.services.auth import (
 )
 
 
-def get_test_database_url() -> str:
-    """Get database URL for testing.
-
-    Uses PostgreSQL if environment variables are set (CI), otherwise raises error.
-    """
-    pg_host = os.getenv("POSTGRES_HOST", "localhost")
-    pg_port = os.getenv("POSTGRES_PORT", "5432")
-    pg_user = os.getenv("POSTGRES_USER", "test")
-    pg_password = os.getenv("POSTGRES_PASSWORD", "test")
-    pg_db = os.getenv("POSTGRES_DB", "test")
-    return f"postgresql+asyncpg://{pg_user}:{pg_password}@{pg_host}:{pg_port}/{pg_db}"
-
-
-# Create test database URL
-TEST_DATABASE_URL = get_test_database_url()
-
-
-@pytest.fixture
-async def db_session():
-    """Create a test database session.
-
-    Creates the engine inside the fixture to avoid event loop issues with asyncpg.
-    """
-    # Create engine inside fixture to use the correct event loop
-    engine = create_async_engine(
-        TEST_DATABASE_URL,
-        echo=False,
-    )
-
-    # Create session factory
-    session_factory = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autoflush=False,
-    )
-
-    # Create tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    # Create and yield session
-    async with session_factory() as session:
-        yield session
-
-    # Drop tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
-    # Dispose engine
-    await engine.dispose()
-
-
-@pytest.fixture
-async def client(db_session: AsyncSession):
-    """Create a test client with overridden database dependency."""
-
-    async def override_get_db():
-        try:
-            yield db_session
-            await db_session.commit()
-        except Exception:
-            await db_session.rollback()
-            raise
-
-    app.dependency_overrides[get_db] = override_get_db
-
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-    ) as ac:
-        yield ac
-
-    app.dependency_overrides.clear()
-
-
 @pytest.fixture
 def user_data() -> UserCreate:
     """Create test user data."""
@@ -119,12 +38,14 @@ async def auth_service(db_session: AsyncSession) -> AuthService:
 
 
 @pytest.fixture
-async def existing_user(db_session: AsyncSession, user_data: UserCreate) -> User:
+async def existing_user(
+    db_session: AsyncSession, user_data: UserCreate, hash_password
+) -> User:
     """Create an existing user in the database."""
     user = User(
         email=user_data.email,
         username=user_data.username,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=hash_password(user_data.password),
     )
     db_session.add(user)
     await db_session.flush()
@@ -0,0 +1,205 @@
+"""Tests for cache service."""
+
+import json
+import time
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from app.services.cache import (
+    DELETE_PATTERN_BATCH_SIZE,
+    CacheService,
+    LocalTTLCache,
+)
+
+
+@pytest.fixture
+def redis_client():
+    """Create a mock Redis client."""
+    client = AsyncMock()
+    client.get = AsyncMock(return_value=None)
+    client.hget = AsyncMock(return_value=None)
+    client.mget = AsyncMock(side_effect=lambda keys: [None] * len(keys))
+    client.set = AsyncMock(return_value=True)
+    client.setex = AsyncMock(return_value=True)
+    client.delete = AsyncMock(return_value=1)
+    client.unlink = AsyncMock(return_value=1)
+    client.scan_iter = lambda match, count=None: _scan()
+    return client
+
+
+async def _scan(keys=()):
+    """Yield the given keys, like a Redis SCAN."""
+    for key in keys:
+        yield key
+
+
+class TestLocalTTLCache:
+    """Tests for LocalTTLCache."""
+
+    def test_get_set(self):
+        """Test values are returned until they expire."""
+        cache = LocalTTLCache()
+        with patch("app.services.cache.time.monotonic", return_value=100.0):
+            cache.set("key", {"a": 1}, 30)
+            assert cache.get("key") == {"a": 1}
+
+        with patch("app.services.cache.time.monotonic", return_value=130.0):
+            assert cache.get("key") is None
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted at maxsize."""
+        cache = LocalTTLCache(maxsize=2)
+        cache.set("a", 1, 30)
+        cache.set("b", 2, 30)
+        cache.get("a")
+        cache.set("c", 3, 30)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_delete_pattern(self):
+        """Test glob patterns delete only matching keys."""
+        cache = LocalTTLCache()
+        cache.set("recommendations:u1:discover:10", 1, 30)
+        cache.set("recommendations:u2:discover:10", 2, 30)
+
+        cache.delete_pattern("recommendations:u1:*")
+
+        assert cache.get("recommendations:u1:discover:10") is None
+        assert cache.get("recommendations:u2:discover:10") == 2
+
+
+class TestCacheService:
+    """Tests for CacheService local caching."""
+
+    async def test_local_hit_skips_redis(self, redis_client):
+        """Test values set with a local TTL are served without Redis."""
+        cache = CacheService(redis_client)
+
+        await cache.set("key", {"a": 1}, 300, local_ttl_seconds=30)
+        assert await cache.get("key") == {"a": 1}
+        assert await cache.get_many(["key"]) == [{"a": 1}]
+
+        redis_client.get.assert_not_called()
+        redis_client.mget.assert_not_called()
+
+    async def test_without_local_ttl_reads_redis(self, redis_client):
+        """Test values set without a local TTL always go to Redis."""
+        cache = CacheService(redis_client)
+        redis_client.get.return_value = '{"a": 1}'
+
+        await cache.set("key", {"a": 1}, 300)
+        assert await cache.get("key") == {"a": 1}
+
+        redis_client.get.assert_called_once_with("key")
+
+    async def test_set_serializes_uuids_and_datetimes(self, redis_client):
+        """Test UUIDs and datetimes are stored as JSON strings."""
+        cache = CacheService(redis_client)
+        song_id = uuid4()
+        played_at = datetime(2025, 1, 1, 12, 30, tzinfo=UTC)
+
+        assert await cache.set("key", {"id": song_id, "played_at": played_at}, 300)
+
+        _, _, payload = redis_client.setex.call_args.args
+        assert json.loads(payload) == {
+            "id": str(song_id),
+            "played_at": "2025-01-01T12:30:00+00:00",
+        }
+
+    async def test_delete_pattern_clears_local(self, redis_client):
+        """Test pattern deletion also drops local entries."""
+        cache = CacheService(redis_client)
+
+        await cache.set("recommendations:u1:mix", [1], 300, local_ttl_seconds=30)
+        await cache.delete_pattern("recommendations:u1:*")
+
+        assert await cache.get("recommendations:u1:mix") is None
+        redis_client.get.assert_called_once_with("recommendations:u1:mix")
+
+    async def test_delete_pattern_unlinks_in_batches(self, redis_client):
+        """Test scanned keys are unlinked in bounded batches."""
+        cache = CacheService(redis_client)
+        keys = [f"stats:u1:{i}" for i in range(DELETE_PATTERN_BATCH_SIZE * 2 + 1)]
+        redis_client.scan_iter = lambda match, count=None: _scan(keys)
+
+        assert await cache.delete_pattern("stats:u1:*") is True
+
+        batches = [call.args for call in redis_client.unlink.call_args_list]
+        assert [len(batch) for batch in batches] == [
+            DELETE_PATTERN_BATCH_SIZE,
+            DELETE_PATTERN_BATCH_SIZE,
+            1,
+        ]
+        assert [key for batch in batches for key in batch] == keys
+
+    async def test_hget_skips_expired_fields(self, redis_client):
+        """Test hash fields expire on their own."""
+        cache = CacheService(redis_client)
+        redis_client.hget.return_value = json.dumps(
+            {"value": {"a": 1}, "expires_at": time.time() - 1}
+        )
+
+        assert await cache.hget("stats:u1", "overview:all") is None
+
+        redis_client.hget.return_value = json.dumps(
+            {"value": {"a": 1}, "expires_at": time.time() + 60}
+        )
+        assert await cache.hget("stats:u1", "overview:all") == {"a": 1}
+        redis_client.hget.assert_called_with("stats:u1", "overview:all")
+
+    async def test_hset_keeps_longest_field_ttl(self):
+        """Test a short-lived field never shortens the hash TTL."""
+        cache = CacheService(FakeAsyncRedis(decode_responses=True))
+
+        await cache.hset("stats:u1", "overview:all", {"a": 1}, ttl_seconds=3600)
+        await cache.hset("stats:u1", "trends:week", {"b": 2}, ttl_seconds=60)
+
+        redis = await cache._get_client()
+        assert await redis.ttl("stats:u1") > 60
+        assert await cache.hget("stats:u1", "overview:all") == {"a": 1}
+
+        await cache.hset("stats:u1", "trends:week", {"b": 2}, ttl_seconds=7200)
+        assert await redis.ttl("stats:u1") > 3600
+
+    async def test_swr_fresh_hit(self, redis_client):
+        """Test fresh values are returned without calling the factory."""
+        cache = CacheService(redis_client)
+        redis_client.get.return_value = json.dumps(
+            {"value": {"a": 1}, "fresh_until": time.time() + 60}
+        )
+        factory = AsyncMock(return_value={"a": 2})
+
+        assert await cache.get_or_set_swr("key", factory, 300, 60) == {"a": 1}
+        factory.assert_not_called()
+
+    async def test_swr_stale_hit_while_refreshing(self, redis_client):
+        """Test stale values are served while another caller refreshes."""
+        cache = CacheService(redis_client)
+        redis_client.get.return_value = json.dumps(
+            {"value": {"a": 1}, "fresh_until": time.time() - 1}
+        )
+        redis_client.set.return_value = None  # lock already held
+        factory = AsyncMock(return_value={"a": 2})
+
+        assert await cache.get_or_set_swr("key", factory, 300, 60) == {"a": 1}
+        factory.assert_not_called()
+
+    async def test_swr_stale_hit_refreshes(self, redis_client):
+        """Test the caller holding the lock recomputes a stale value."""
+        cache = CacheService(redis_client)
+        redis_client.get.return_value = json.dumps(
+            {"value": {"a": 1}, "fresh_until": time.time() - 1}
+        )
+        factory = AsyncMock(return_value={"a": 2})
+
+        assert await cache.get_or_set_swr("key", factory, 300, 60) == {"a": 2}
+        redis_client.set.assert_called_once_with("key:refresh", "1", nx=True, ex=60)
+        key, ttl, payload = redis_client.setex.call_args.args
+        assert (key, ttl) == ("key", 360)
+        assert json.loads(payload)["value"] == {"a": 2}
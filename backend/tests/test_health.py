@@ -1,19 +1,13 @@
 """Health endpoint tests."""
 
 import pytest
-from httpx import ASGITransport, AsyncClient
-
-from app.main import app
+from httpx import AsyncClient
 
 
 @pytest.fixture
-async def client():
+def client(shared_client: AsyncClient) -> AsyncClient:
     """Create test client."""
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-    ) as client:
-        yield client
+    return shared_client
 
 
 @pytest.mark.asyncio
@@ -1,18 +1,14 @@
 """Tests for mood chains service and endpoints."""
 
-import os
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 import pytest
-from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import create_access_token, get_password_hash
-from app.db.base import Base
-from app.db.session import get_db
-from app.main import app
 from app.models.listening_history import ListeningHistory
-from app.models.mood_chain import MoodChain, TransitionStyle
+from app.models.mood_chain import MoodChain, MoodChainSong, TransitionStyle
 from app.models.song import Song
 from app.models.user import User
 from app.schemas.mood_chain import (
@@ -30,160 +26,80 @@ from app.services.mood_chain import (
 )
 
 
-def get_test_database_url() -> str:
-    """Get database URL for testing."""
-    pg_host = os.getenv("POSTGRES_HOST", "localhost")
-    pg_port = os.getenv("POSTGRES_PORT", "5432")
-    pg_user = os.getenv("POSTGRES_USER", "test")
-    pg_password = os.getenv("POSTGRES_PASSWORD", "test")
-    pg_db = os.getenv("POSTGRES_DB", "test")
-    return f"postgresql+asyncpg://{pg_user}:{pg_password}@{pg_host}:{pg_port}/{pg_db}"
-
-
-TEST_DATABASE_URL = get_test_database_url()
-
-
-@pytest.fixture
-async def db_session():
-    """Create a test database session."""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-    session_factory = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autoflush=False,
-    )
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    async with session_factory() as session:
-        yield session
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
-    await engine.dispose()
-
-
-@pytest.fixture
-async def client(db_session: AsyncSession):
-    """Create a test client with overridden database dependency."""
-
-    async def override_get_db():
-        try:
-            yield db_session
-            await db_session.commit()
-        except Exception:
-            await db_session.rollback()
-            raise
-
-    app.dependency_overrides[get_db] = override_get_db
-
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-    ) as ac:
-        yield ac
-
-    app.dependency_overrides.clear()
+def build_song(owner_id: UUID, **overrides) -> Song:
+    """Build an unsaved test song; keyword arguments override the defaults."""
+    fields = {
+        "title": "Test Song",
+        "artist": "Test Artist",
+        "album": "Test Album",
+        "genre": "Rock",
+        "year": 2023,
+        "duration_seconds": 180,
+        "file_path": "/tmp/test_song.mp3",
+        "file_size_bytes": 5000000,
+        "file_format": "mp3",
+        "bitrate": 320,
+        "sample_rate": 44100,
+        "energy": 0.7,
+        "valence": 0.6,
+    }
+    return Song(owner_id=owner_id, **(fields | overrides))
 
 
 @pytest.fixture
-async def test_user(db_session: AsyncSession) -> User:
-    """Create a test user."""
-    user = User(
-        email="test@example.com",
-        username="testuser",
-        password_hash=get_password_hash("SecurePass123"),
+async def test_songs(
+    db_session: AsyncSession, test_user: User
+) -> tuple[Song, Song, Song]:
+    """Create three test songs with a single INSERT."""
+    songs = (
+        build_song(test_user.id),
+        build_song(
+            test_user.id,
+            title="Another Song",
+            artist="Another Artist",
+            album="Another Album",
+            genre="Pop",
+            year=2024,
+            duration_seconds=200,
+            file_path="/tmp/test_song2.mp3",
+            file_size_bytes=6000000,
+            energy=0.5,
+            valence=0.4,
+        ),
+        build_song(
+            test_user.id,
+            title="Third Song",
+            artist="Third Artist",
+            album="Third Album",
+            year=2024,
+            duration_seconds=220,
+            file_path="/tmp/test_song3.mp3",
+            file_size_bytes=7000000,
+            energy=0.8,
+            valence=0.7,
+        ),
     )
-    db_session.add(user)
+    db_session.add_all(songs)
     await db_session.flush()
-    return user
+    return songs
 
 
 @pytest.fixture
-def auth_token(test_user: User) -> str:
-    """Create auth token for test user."""
-    return create_access_token(str(test_user.id))
+def test_song(test_songs: tuple[Song, Song, Song]) -> Song:
+    """Get the first test song."""
+    return test_songs[0]
 
 
 @pytest.fixture
-def auth_headers(auth_token: str) -> dict:
-    """Create auth headers."""
-    return {"Authorization": f"Bearer {auth_token}"}
+def test_song2(test_songs: tuple[Song, Song, Song]) -> Song:
+    """Get the second test song."""
+    return test_songs[1]
 
 
 @pytest.fixture
-async def test_song(db_session: AsyncSession, test_user: User) -> Song:
-    """Create a test song."""
-    song = Song(
-        owner_id=test_user.id,
-        title="Test Song",
-        artist="Test Artist",
-        album="Test Album",
-        genre="Rock",
-        year=2023,
-        duration_seconds=180,
-        file_path="/tmp/test_song.mp3",
-        file_size_bytes=5000000,
-        file_format="mp3",
-        bitrate=320,
-        sample_rate=44100,
-        energy=0.7,
-        valence=0.6,
-    )
-    db_session.add(song)
-    await db_session.flush()
-    return song
-
-
-@pytest.fixture
-async def test_song2(db_session: AsyncSession, test_user: User) -> Song:
-    """Create a second test song."""
-    song = Song(
-        owner_id=test_user.id,
-        title="Another Song",
-        artist="Another Artist",
-        album="Another Album",
-        genre="Pop",
-        year=2024,
-        duration_seconds=200,
-        file_path="/tmp/test_song2.mp3",
-        file_size_bytes=6000000,
-        file_format="mp3",
-        bitrate=320,
-        sample_rate=44100,
-        energy=0.5,
-        valence=0.4,
-    )
-    db_session.add(song)
-    await db_session.flush()
-    return song
-
-
-@pytest.fixture
-async def test_song3(db_session: AsyncSession, test_user: User) -> Song:
-    """Create a third test song."""
-    song = Song(
-        owner_id=test_user.id,
-        title="Third Song",
-        artist="Third Artist",
-        album="Third Album",
-        genre="Rock",
-        year=2024,
-        duration_seconds=220,
-        file_path="/tmp/test_song3.mp3",
-        file_size_bytes=7000000,
-        file_format="mp3",
-        bitrate=320,
-        sample_rate=44100,
-        energy=0.8,
-        valence=0.7,
-    )
-    db_session.add(song)
-    await db_session.flush()
-    return song
+def test_song3(test_songs: tuple[Song, Song, Song]) -> Song:
+    """Get the third test song."""
+    return test_songs[2]
 
 
 @pytest.fixture
@@ -200,6 +116,26 @@ async def test_mood_chain(db_session: AsyncSession, test_user: User) -> MoodChai
     return mood_chain
 
 
+@pytest.fixture
+async def populated_mood_chain(
+    db_session: AsyncSession,
+    test_mood_chain: MoodChain,
+    test_songs: tuple[Song, Song, Song],
+) -> MoodChain:
+    """Create a test mood chain holding the first two test songs."""
+    songs = test_songs[:2]
+    await db_session.execute(
+        insert(MoodChainSong),
+        [
+            {"mood_chain_id": test_mood_chain.id, "song_id": song.id, "position": i}
+            for i, song in enumerate(songs)
+        ],
+    )
+    test_mood_chain.song_count = len(songs)
+    await db_session.flush()
+    return test_mood_chain
+
+
 class TestMoodChainService:
     """Tests for MoodChainService."""
 
@@ -417,7 +353,7 @@ class TestMoodChainService:
     async def test_reorder_mood_chain_songs(
         self,
         db_session: AsyncSession,
-        test_mood_chain: MoodChain,
+        populated_mood_chain: MoodChain,
         test_song: Song,
         test_song2: Song,
         test_user: User,
@@ -425,17 +361,9 @@ class TestMoodChainService:
         """Test reordering songs in mood chain."""
         service = MoodChainService(db_session)
 
-        # Add songs
-        await service.add_song_to_mood_chain(
-            test_mood_chain.id, test_song.id, test_user.id
-        )
-        await service.add_song_to_mood_chain(
-            test_mood_chain.id, test_song2.id, test_user.id
-        )
-
         # Reorder
         mood_chain = await service.reorder_mood_chain_songs(
-            test_mood_chain.id,
+            populated_mood_chain.id,
             [test_song2.id, test_song.id],
             test_user.id,
         )
@@ -467,7 +395,7 @@ class TestMoodChainService:
     async def test_update_transitions(
         self,
         db_session: AsyncSession,
-        test_mood_chain: MoodChain,
+        populated_mood_chain: MoodChain,
         test_song: Song,
         test_song2: Song,
         test_user: User,
@@ -475,14 +403,6 @@ class TestMoodChainService:
         """Test updating transitions."""
         service = MoodChainService(db_session)
 
-        # Add songs
-        await service.add_song_to_mood_chain(
-            test_mood_chain.id, test_song.id, test_user.id
-        )
-        await service.add_song_to_mood_chain(
-            test_mood_chain.id, test_song2.id, test_user.id
-        )
-
         # Update transitions
         transitions = [
             MoodChainTransitionBase(
@@ -490,7 +410,7 @@ class TestMoodChainService:
             )
         ]
         mood_chain = await service.update_transitions(
-            test_mood_chain.id, transitions, test_user.id
+            populated_mood_chain.id, transitions, test_user.id
         )
 
         assert len(mood_chain.mood_chain_transitions) == 1
@@ -499,7 +419,7 @@ class TestMoodChainService:
     async def test_get_next_song_suggestions(
         self,
         db_session: AsyncSession,
-        test_mood_chain: MoodChain,
+        populated_mood_chain: MoodChain,
         test_song: Song,
         test_song2: Song,
         test_user: User,
@@ -507,16 +427,8 @@ class TestMoodChainService:
         """Test getting next song suggestions."""
         service = MoodChainService(db_session)
 
-        # Add songs
-        await service.add_song_to_mood_chain(
-            test_mood_chain.id, test_song.id, test_user.id
-        )
-        await service.add_song_to_mood_chain(
-            test_mood_chain.id, test_song2.id, test_user.id
-        )
-
         suggestions = await service.get_next_song_suggestions(
-            test_mood_chain.id, test_song.id, test_user.id
+            populated_mood_chain.id, test_song.id, test_user.id
         )
 
         assert len(suggestions) == 1
@@ -555,21 +467,19 @@ class TestMoodChainService:
         """Test creating mood chain from listening history."""
         service = MoodChainService(db_session)
 
-        # Create listening history
-        for _ in range(3):
-            history = ListeningHistory(
-                user_id=test_user.id,
-                song_id=test_song.id,
-                played_duration_seconds=180,
-            )
-            db_session.add(history)
-            history = ListeningHistory(
-                user_id=test_user.id,
-                song_id=test_song2.id,
-                played_duration_seconds=200,
-            )
-            db_session.add(history)
-        await db_session.flush()
+        # Create listening history in one INSERT
+        await db_session.execute(
+            insert(ListeningHistory),
+            [
+                {
+                    "user_id": test_user.id,
+                    "song_id": song.id,
+                    "played_duration_seconds": duration,
+                }
+                for _ in range(3)
+                for song, duration in ((test_song, 180), (test_song2, 200))
+            ],
+        )
 
         data = MoodChainFromHistoryRequest(name="From History", min_plays=2)
         mood_chain = await service.create_from_history(test_user.id, data)
@@ -744,26 +654,14 @@ class TestMoodChainsEndpoints:
         self,
         client: AsyncClient,
         auth_headers: dict,
-        test_mood_chain: MoodChain,
+        populated_mood_chain: MoodChain,
         test_song: Song,
         test_song2: Song,
     ):
         """Test reordering songs in mood chain."""
-        # Add songs
-        await client.post(
-            f"/api/v1/mood-chains/{test_mood_chain.id}/songs",
-            headers=auth_headers,
-            json={"song_id": str(test_song.id)},
-        )
-        await client.post(
-            f"/api/v1/mood-chains/{test_mood_chain.id}/songs",
-            headers=auth_headers,
-            json={"song_id": str(test_song2.id)},
-        )
-
         # Reorder
         response = await client.put(
-            f"/api/v1/mood-chains/{test_mood_chain.id}/songs/order",
+            f"/api/v1/mood-chains/{populated_mood_chain.id}/songs/order",
             headers=auth_headers,
             json={"song_ids": [str(test_song2.id), str(test_song.id)]},
         )
@@ -777,26 +675,14 @@ class TestMoodChainsEndpoints:
         self,
         client: AsyncClient,
         auth_headers: dict,
-        test_mood_chain: MoodChain,
+        populated_mood_chain: MoodChain,
         test_song: Song,
         test_song2: Song,
     ):
         """Test updating transitions."""
-        # Add songs
-        await client.post(
-            f"/api/v1/mood-chains/{test_mood_chain.id}/songs",
-            headers=auth_headers,
-            json={"song_id": str(test_song.id)},
-        )
-        await client.post(
-            f"/api/v1/mood-chains/{test_mood_chain.id}/songs",
-            headers=auth_headers,
-            json={"song_id": str(test_song2.id)},
-        )
-
         # Update transitions
         response = await client.put(
-            f"/api/v1/mood-chains/{test_mood_chain.id}/transitions",
+            f"/api/v1/mood-chains/{populated_mood_chain.id}/transitions",
             headers=auth_headers,
             json={
                 "transitions": [
@@ -824,21 +710,19 @@ class TestMoodChainsEndpoints:
         test_song2: Song,
     ):
         """Test creating mood chain from history."""
-        # Create listening history
-        for _ in range(3):
-            history = ListeningHistory(
-                user_id=test_user.id,
-                song_id=test_song.id,
-                played_duration_seconds=180,
-            )
-            db_session.add(history)
-            history = ListeningHistory(
-                user_id=test_user.id,
-                song_id=test_song2.id,
-                played_duration_seconds=200,
-            )
-            db_session.add(history)
-        await db_session.flush()
+        # Create listening history in one INSERT
+        await db_session.execute(
+            insert(ListeningHistory),
+            [
+                {
+                    "user_id": test_user.id,
+                    "song_id": song.id,
+                    "played_duration_seconds": duration,
+                }
+                for _ in range(3)
+                for song, duration in ((test_song, 180), (test_song2, 200))
+            ],
+        )
 
         response = await client.post(
             "/api/v1/mood-chains/from-history",
@@ -855,25 +739,13 @@ class TestMoodChainsEndpoints:
         self,
         client: AsyncClient,
         auth_headers: dict,
-        test_mood_chain: MoodChain,
+        populated_mood_chain: MoodChain,
         test_song: Song,
         test_song2: Song,
     ):
         """Test getting next song suggestions."""
-        # Add songs
-        await client.post(
-            f"/api/v1/mood-chains/{test_mood_chain.id}/songs",
-            headers=auth_headers,
-            json={"song_id": str(test_song.id)},
-        )
-        await client.post(
-            f"/api/v1/mood-chains/{test_mood_chain.id}/songs",
-            headers=auth_headers,
-            json={"song_id": str(test_song2.id)},
-        )
-
         response = await client.get(
-            f"/api/v1/mood-chains/{test_mood_chain.id}/next"
+            f"/api/v1/mood-chains/{populated_mood_chain.id}/next"
             f"?current_song_id={test_song.id}",
             headers=auth_headers,
         )
@@ -913,14 +785,11 @@ class TestMoodChainsEndpoints:
         test_user: User,
     ):
         """Test mood chains pagination."""
-        # Create multiple mood chains
-        for i in range(15):
-            chain = MoodChain(
-                owner_id=test_user.id,
-                name=f"Chain {i}",
-            )
-            db_session.add(chain)
-        await db_session.flush()
+        # Create multiple mood chains in one INSERT
+        await db_session.execute(
+            insert(MoodChain),
+            [{"owner_id": test_user.id, "name": f"Chain {i}"} for i in range(15)],
+        )
 
         # Get first page
         response = await client.get(
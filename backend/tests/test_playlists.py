@@ -1,16 +1,12 @@
 """Tests for playlists service and endpoints."""
 
-import os
 from uuid import uuid4
 
 import pytest
-from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import create_access_token, get_password_hash
-from app.db.base import Base
-from app.db.session import get_db
-from app.main import app
 from app.models.playlist import Playlist
 from app.models.song import Song
 from app.models.user import User
@@ -24,132 +20,54 @@ from app.services.playlist import (
 )
 
 
-def get_test_database_url() -> str:
-    """Get database URL for testing."""
-    pg_host = os.getenv("POSTGRES_HOST", "localhost")
-    pg_port = os.getenv("POSTGRES_PORT", "5432")
-    pg_user = os.getenv("POSTGRES_USER", "test")
-    pg_password = os.getenv("POSTGRES_PASSWORD", "test")
-    pg_db = os.getenv("POSTGRES_DB", "test")
-    return f"postgresql+asyncpg://{pg_user}:{pg_password}@{pg_host}:{pg_port}/{pg_db}"
-
-
-TEST_DATABASE_URL = get_test_database_url()
-
-
 @pytest.fixture
-async def db_session():
-    """Create a test database session."""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-    session_factory = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autoflush=False,
+async def test_songs(db_session: AsyncSession, test_user: User) -> tuple[Song, Song]:
+    """Create two test songs with a single INSERT."""
+    songs = (
+        Song(
+            owner_id=test_user.id,
+            title="Test Song",
+            artist="Test Artist",
+            album="Test Album",
+            genre="Rock",
+            year=2023,
+            duration_seconds=180,
+            file_path="/tmp/test_song.mp3",
+            file_size_bytes=5000000,
+            file_format="mp3",
+            bitrate=320,
+            sample_rate=44100,
+        ),
+        Song(
+            owner_id=test_user.id,
+            title="Another Song",
+            artist="Another Artist",
+            album="Another Album",
+            genre="Pop",
+            year=2024,
+            duration_seconds=200,
+            file_path="/tmp/test_song2.mp3",
+            file_size_bytes=6000000,
+            file_format="mp3",
+            bitrate=320,
+            sample_rate=44100,
+        ),
     )
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    async with session_factory() as session:
-        yield session
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
-    await engine.dispose()
-
-
-@pytest.fixture
-async def client(db_session: AsyncSession):
-    """Create a test client with overridden database dependency."""
-
-    async def override_get_db():
-        try:
-            yield db_session
-            await db_session.commit()
-        except Exception:
-            await db_session.rollback()
-            raise
-
-    app.dependency_overrides[get_db] = override_get_db
-
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-    ) as ac:
-        yield ac
-
-    app.dependency_overrides.clear()
-
-
-@pytest.fixture
-async def test_user(db_session: AsyncSession) -> User:
-    """Create a test user."""
-    user = User(
-        email="test@example.com",
-        username="testuser",
-        password_hash=get_password_hash("SecurePass123"),
-    )
-    db_session.add(user)
+    db_session.add_all(songs)
     await db_session.flush()
-    return user
-
-
-@pytest.fixture
-def auth_token(test_user: User) -> str:
-    """Create auth token for test user."""
-    return create_access_token(str(test_user.id))
-
-
-@pytest.fixture
-def auth_headers(auth_token: str) -> dict:
-    """Create auth headers."""
-    return {"Authorization": f"Bearer {auth_token}"}
+    return songs
 
 
 @pytest.fixture
-async def test_song(db_session: AsyncSession, test_user: User) -> Song:
-    """Create a test song."""
-    song = Song(
-        owner_id=test_user.id,
-        title="Test Song",
-        artist="Test Artist",
-        album="Test Album",
-        genre="Rock",
-        year=2023,
-        duration_seconds=180,
-        file_path="/tmp/test_song.mp3",
-        file_size_bytes=5000000,
-        file_format="mp3",
-        bitrate=320,
-        sample_rate=44100,
-    )
-    db_session.add(song)
-    await db_session.flush()
-    return song
+def test_song(test_songs: tuple[Song, Song]) -> Song:
+    """Get the first test song."""
+    return test_songs[0]
 
 
 @pytest.fixture
-async def test_song2(db_session: AsyncSession, test_user: User) -> Song:
-    """Create a second test song."""
-    song = Song(
-        owner_id=test_user.id,
-        title="Another Song",
-        artist="Another Artist",
-        album="Another Album",
-        genre="Pop",
-        year=2024,
-        duration_seconds=200,
-        file_path="/tmp/test_song2.mp3",
-        file_size_bytes=6000000,
-        file_format="mp3",
-        bitrate=320,
-        sample_rate=44100,
-    )
-    db_session.add(song)
-    await db_session.flush()
-    return song
+def test_song2(test_songs: tuple[Song, Song]) -> Song:
+    """Get the second test song."""
+    return test_songs[1]
 
 
 @pytest.fixture
@@ -601,14 +519,11 @@ class TestPlaylistsEndpoints:
         test_user: User,
     ):
         """Test playlists pagination."""
-        # Create multiple playlists
-        for i in range(15):
-            playlist = Playlist(
-                owner_id=test_user.id,
-                name=f"Playlist {i}",
-            )
-            db_session.add(playlist)
-        await db_session.flush()
+        # Create multiple playlists in one INSERT
+        await db_session.execute(
+            insert(Playlist),
+            [{"owner_id": test_user.id, "name": f"Playlist {i}"} for i in range(15)],
+        )
 
         # Get first page
         response = await client.get(
@@ -1,113 +1,28 @@
 """Tests for recommendations service and endpoints."""
 
-import os
+import random
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 import pytest
-from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-
-from app.core.security import create_access_token, get_password_hash
-from app.db.base import Base
-from app.db.session import get_db
-from app.main import app
-from app.models.playlist import Playlist
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.listening_history import ListeningHistory
+from app.models.playlist import Playlist, PlaylistSong
 from app.models.song import Song
 from app.models.user import User
 from app.schemas.recommendation import DiscoverSectionType, MoodType
-from app.services.cache import CacheService
+from app.services.cache import CacheService, song_to_cache
 from app.services.recommendation import (
+    LOCAL_CACHE_TTL,
     RecommendationService,
     SearchService,
     SongNotFoundError,
 )
 
 
-def get_test_database_url() -> str:
-    """Get database URL for testing."""
-    pg_host = os.getenv("POSTGRES_HOST", "localhost")
-    pg_port = os.getenv("POSTGRES_PORT", "5432")
-    pg_user = os.getenv("POSTGRES_USER", "test")
-    pg_password = os.getenv("POSTGRES_PASSWORD", "test")
-    pg_db = os.getenv("POSTGRES_DB", "test")
-    return f"postgresql+asyncpg://{pg_user}:{pg_password}@{pg_host}:{pg_port}/{pg_db}"
-
-
-TEST_DATABASE_URL = get_test_database_url()
-
-
-@pytest.fixture
-async def db_session():
-    """Create a test database session."""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-    session_factory = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autoflush=False,
-    )
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    async with session_factory() as session:
-        yield session
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
-    await engine.dispose()
-
-
-@pytest.fixture
-async def client(db_session: AsyncSession):
-    """Create a test client with overridden database dependency."""
-
-    async def override_get_db():
-        try:
-            yield db_session
-            await db_session.commit()
-        except Exception:
-            await db_session.rollback()
-            raise
-
-    app.dependency_overrides[get_db] = override_get_db
-
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-    ) as ac:
-        yield ac
-
-    app.dependency_overrides.clear()
-
-
-@pytest.fixture
-async def test_user(db_session: AsyncSession) -> User:
-    """Create a test user."""
-    user = User(
-        email="test@example.com",
-        username="testuser",
-        password_hash=get_password_hash("SecurePass123"),
-    )
-    db_session.add(user)
-    await db_session.flush()
-    return user
-
-
-@pytest.fixture
-def auth_token(test_user: User) -> str:
-    """Create auth token for test user."""
-    return create_access_token(str(test_user.id))
-
-
-@pytest.fixture
-def auth_headers(auth_token: str) -> dict:
-    """Create auth headers."""
-    return {"Authorization": f"Bearer {auth_token}"}
-
-
 @pytest.fixture
 async def test_song(db_session: AsyncSession, test_user: User) -> Song:
     """Create a test song with audio parameters."""
@@ -239,6 +154,7 @@ def mock_cache():
     """Create a mock cache service."""
     cache = MagicMock(spec=CacheService)
     cache.get = AsyncMock(return_value=None)
+    cache.get_many = AsyncMock(side_effect=lambda keys, *_: [None] * len(keys))
     cache.set = AsyncMock(return_value=True)
     cache.delete = AsyncMock(return_value=True)
     cache.delete_pattern = AsyncMock(return_value=True)
@@ -285,6 +201,26 @@ class TestRecommendationService:
         assert score < 0.5  # Should have lower similarity
         assert "same genre" not in reasons
 
+    async def test_similarity_score_expr_matches_python(
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_songs_with_variety: list[Song],
+        mock_cache,
+    ):
+        """Test SQL similarity scores agree with the Python implementation."""
+        service = RecommendationService(db_session, cache=mock_cache)
+
+        source_song = test_songs_with_variety[0]
+        score_expr = service._similarity_score_expr(source_song)
+        result = await db_session.execute(
+            select(Song, score_expr).where(Song.owner_id == test_user.id)
+        )
+
+        for candidate, sql_score in result.all():
+            score, _ = service._calculate_similarity(source_song, candidate)
+            assert sql_score == pytest.approx(score)
+
     async def test_get_similar_songs(
         self,
         db_session: AsyncSession,
@@ -310,6 +246,49 @@ class TestRecommendationService:
             top_similar_song = similar[0][0]
             assert top_similar_song.genre == "Rock"
 
+    async def test_get_similar_songs_cache_hit(
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_songs_with_variety: list[Song],
+        mock_cache,
+    ):
+        """Test cached similar songs are rebuilt without querying the database."""
+        service = RecommendationService(db_session, cache=mock_cache)
+
+        source_song = test_songs_with_variety[0]
+        cached_song = test_songs_with_variety[1]
+        mock_cache.get.return_value = {
+            "source": song_to_cache(source_song),
+            "similar": [
+                {
+                    "song": song_to_cache(cached_song),
+                    "score": 0.9,
+                    "reasons": ["same genre"],
+                }
+            ],
+        }
+
+        source, similar = await service.get_similar_songs(
+            song_id=source_song.id,
+            user_id=test_user.id,
+            limit=3,
+        )
+
+        mock_cache.get.assert_called_once_with(
+            f"recommendations:{test_user.id}:similar:{source_song.id}:3",
+            LOCAL_CACHE_TTL,
+        )
+        mock_cache.set.assert_not_called()
+        assert source.id == source_song.id
+        assert len(similar) == 1
+        song, score, reasons = similar[0]
+        assert song.id == cached_song.id
+        assert song.title == cached_song.title
+        assert song.created_at == cached_song.created_at
+        assert score == 0.9
+        assert reasons == ["same genre"]
+
     async def test_get_similar_songs_not_found(
         self, db_session: AsyncSession, test_user: User, mock_cache
     ):
@@ -323,6 +302,36 @@ class TestRecommendationService:
                 limit=10,
             )
 
+    async def test_get_frequently_played_together(
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_songs_with_variety: list[Song],
+        mock_cache,
+    ):
+        """Test songs played after a source song are ranked by transitions."""
+        source, first, second = test_songs_with_variety[:3]
+        for next_song in (first, second, second):
+            db_session.add(
+                ListeningHistory(
+                    user_id=test_user.id,
+                    song_id=next_song.id,
+                    previous_song_id=source.id,
+                )
+            )
+        await db_session.flush()
+        service = RecommendationService(db_session, cache=mock_cache)
+
+        together = await service.get_frequently_played_together(
+            song_id=source.id,
+            user_id=test_user.id,
+        )
+
+        assert [(song.id, count) for song, count in together] == [
+            (second.id, 2),
+            (first.id, 1),
+        ]
+
     async def test_get_discover_recommendations(
         self,
         db_session: AsyncSession,
@@ -342,6 +351,31 @@ class TestRecommendationService:
         assert DiscoverSectionType.BASED_ON_FAVORITE in sections
         assert DiscoverSectionType.HIDDEN_GEMS in sections
 
+    async def test_get_discover_recommendations_sections(
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_songs_with_variety: list[Song],
+        mock_cache,
+    ):
+        """Test discover sections exclude favorites and respect the limit."""
+        service = RecommendationService(db_session, cache=mock_cache)
+
+        sections = await service.get_discover_recommendations(
+            user_id=test_user.id,
+            limit=2,
+        )
+
+        # Never played songs with play_count >= 5, most played first
+        long_time = sections[DiscoverSectionType.LONG_TIME_NO_LISTEN]
+        assert [s.title for s in long_time] == ["Rock Song 1", "Rock Song 2"]
+
+        # Top 5 by play_count are favorites, leaving only "Calm Song"
+        based_on_favorite = sections[DiscoverSectionType.BASED_ON_FAVORITE]
+        assert [s.title for s in based_on_favorite] == ["Calm Song"]
+        for song in sections[DiscoverSectionType.HIDDEN_GEMS]:
+            assert song.play_count <= 3
+
     async def test_get_personal_mix(
         self,
         db_session: AsyncSession,
@@ -403,6 +437,79 @@ class TestRecommendationService:
             if song.energy is not None:
                 assert song.energy <= 0.4 or song.energy is None
 
+    async def test_get_personal_mix_loads_full_rows(
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_songs_with_variety: list[Song],
+        mock_cache,
+    ):
+        """Test mix songs are fully loaded although candidates are not."""
+        db_session.expunge_all()
+        service = RecommendationService(db_session, cache=mock_cache)
+
+        songs, _ = await service.get_personal_mix(
+            user_id=test_user.id,
+            duration_minutes=30,
+        )
+
+        assert len(songs) > 0
+        for song in songs:
+            # Would raise on lazy load in an async session
+            assert song.genre is not None
+            assert song.created_at is not None
+
+    async def test_get_personal_mix_seeded(
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_songs_with_variety: list[Song],
+        mock_cache,
+    ):
+        """Test a seeded random generator gives a reproducible mix."""
+        mixes = []
+        for _ in range(2):
+            service = RecommendationService(
+                db_session, cache=mock_cache, rng=random.Random(42)
+            )
+            songs, _ = await service.get_personal_mix(
+                user_id=test_user.id,
+                duration_minutes=10,
+            )
+            mixes.append([song.id for song in songs])
+
+        assert mixes[0] == mixes[1]
+
+    async def test_get_personal_mix_sampled(
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_songs_with_variety: list[Song],
+        mock_cache,
+        monkeypatch: pytest.MonkeyPatch,
+        count_queries,
+    ):
+        """Test the sampled path still fills the mix and honours the mood."""
+        monkeypatch.setattr("app.services.recommendation.MIX_SAMPLE_MIN_ROWS", 0)
+        # Sample fewer songs than the four energetic ones in the library
+        monkeypatch.setattr("app.services.recommendation.MIX_SAMPLE_FACTOR", 2)
+        service = RecommendationService(db_session, cache=mock_cache)
+
+        with count_queries(db_session) as queries:
+            songs, total_duration = await service.get_personal_mix(
+                user_id=test_user.id,
+                mood=MoodType.ENERGETIC,
+                duration_minutes=5,
+            )
+
+        # The sample is drawn from the owner's rows, not the shared table
+        assert any("ORDER BY random()" in q for q in queries)
+        assert not any("TABLESAMPLE" in q for q in queries)
+        assert total_duration >= 5 * 60
+        for song in songs:
+            assert song.owner_id == test_user.id
+            assert song.energy is None or song.energy >= 0.6
+
 
 class TestSearchService:
     """Tests for SearchService."""
@@ -447,6 +554,11 @@ class TestSearchService:
 
         assert len(results["artists"]) > 0
         assert results["artists"][0]["name"] == "Rock Artist"
+        # Top songs are grouped per artist, most played first
+        assert [s.title for s in results["artists"][0]["songs"]] == [
+            "Rock Song 1",
+            "Rock Song 2",
+        ]
 
     async def test_search_albums(
         self,
@@ -466,15 +578,25 @@ class TestSearchService:
         )
 
         assert len(results["albums"]) > 0
+        for album in results["albums"]:
+            assert album["song_count"] == len(album["songs"])
+            for song in album["songs"]:
+                assert song.album == album["name"]
+                assert song.artist == album["artist"]
 
     async def test_search_playlists(
         self,
         db_session: AsyncSession,
         test_user: User,
         test_playlist: Playlist,
+        test_song: Song,
         mock_cache,
     ):
         """Test searching for playlists."""
+        db_session.add(
+            PlaylistSong(playlist_id=test_playlist.id, song_id=test_song.id, position=0)
+        )
+        await db_session.flush()
         service = SearchService(db_session, cache=mock_cache)
 
         results = await service.search(
@@ -486,6 +608,7 @@ class TestSearchService:
 
         assert len(results["playlists"]) > 0
         assert results["playlists"][0]["name"] == "Test Playlist"
+        assert results["playlists"][0]["song_count"] == 1
 
     async def test_search_all(
         self,
@@ -511,6 +634,67 @@ class TestSearchService:
         assert "albums" in results
         assert "playlists" in results
 
+    async def test_search_cached(
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_songs_with_variety: list[Song],
+        mock_cache,
+    ):
+        """Test search results round-trip through the cache."""
+        service = SearchService(db_session, cache=mock_cache)
+
+        results = await service.search(
+            user_id=test_user.id,
+            query=" Rock ",
+            search_type="all",
+            limit=10,
+        )
+
+        mock_cache.set.assert_called_once()
+        cache_key, payload, _ = mock_cache.set.call_args.args
+        assert cache_key.startswith(f"search:{test_user.id}:all:10:")
+
+        # Same query in a different case hits the cached payload
+        mock_cache.get.return_value = payload
+        cached = await service.search(
+            user_id=test_user.id,
+            query="ROCK",
+            search_type="all",
+            limit=10,
+        )
+
+        mock_cache.get.assert_called_with(cache_key)
+        assert [s.id for s in cached["songs"]] == [s.id for s in results["songs"]]
+        assert cached["artists"][0]["name"] == results["artists"][0]["name"]
+        assert [s.title for s in cached["artists"][0]["songs"]] == [
+            s.title for s in results["artists"][0]["songs"]
+        ]
+
+    async def test_search_no_group_matches_skips_group_queries(
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_songs_with_variety: list[Song],
+        mock_cache,
+        count_queries,
+    ):
+        """Test no per-group song query runs when no artist or album matches."""
+        service = SearchService(db_session, cache=mock_cache)
+
+        with count_queries(db_session) as queries:
+            results = await service.search(
+                user_id=test_user.id,
+                query="no such name",
+                search_type="all",
+                limit=10,
+            )
+
+        assert results["artists"] == []
+        assert results["albums"] == []
+        # songs, artists, albums and playlists: one query each
+        assert len(queries) == 4
+
     async def test_search_empty_query(
         self, db_session: AsyncSession, test_user: User, mock_cache
     ):
@@ -1,110 +1,29 @@
 """Tests for songs service and endpoints."""
 
 import io
-import os
 import tempfile
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 import pytest
-from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import create_access_token, get_password_hash
-from app.db.base import Base
-from app.db.session import get_db
-from app.main import app
+from app.models.listening_history import ListeningHistory, UserGenrePlays
 from app.models.song import Song
 from app.models.user import User
 from app.schemas.song import SongFilters, SongUpdate
 from app.services.metadata import MetadataExtractor
 from app.services.music import MusicService, SongNotFoundError
-from app.services.storage import StorageService, UnsupportedFormatError
-
-
-def get_test_database_url() -> str:
-    """Get database URL for testing."""
-    pg_host = os.getenv("POSTGRES_HOST", "localhost")
-    pg_port = os.getenv("POSTGRES_PORT", "5432")
-    pg_user = os.getenv("POSTGRES_USER", "test")
-    pg_password = os.getenv("POSTGRES_PASSWORD", "test")
-    pg_db = os.getenv("POSTGRES_DB", "test")
-    return f"postgresql+asyncpg://{pg_user}:{pg_password}@{pg_host}:{pg_port}/{pg_db}"
-
-
-TEST_DATABASE_URL = get_test_database_url()
-
-
-@pytest.fixture
-async def db_session():
-    """Create a test database session."""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-    session_factory = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autoflush=False,
-    )
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    async with session_factory() as session:
-        yield session
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
-    await engine.dispose()
-
-
-@pytest.fixture
-async def client(db_session: AsyncSession):
-    """Create a test client with overridden database dependency."""
-
-    async def override_get_db():
-        try:
-            yield db_session
-            await db_session.commit()
-        except Exception:
-            await db_session.rollback()
-            raise
-
-    app.dependency_overrides[get_db] = override_get_db
-
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-    ) as ac:
-        yield ac
-
-    app.dependency_overrides.clear()
-
-
-@pytest.fixture
-async def test_user(db_session: AsyncSession) -> User:
-    """Create a test user."""
-    user = User(
-        email="test@example.com",
-        username="testuser",
-        password_hash=get_password_hash("SecurePass123"),
-    )
-    db_session.add(user)
-    await db_session.flush()
-    return user
-
-
-@pytest.fixture
-def auth_token(test_user: User) -> str:
-    """Create auth token for test user."""
-    return create_access_token(str(test_user.id))
-
-
-@pytest.fixture
-def auth_headers(auth_token: str) -> dict:
-    """Create auth headers."""
-    return {"Authorization": f"Bearer {auth_token}"}
+from app.services.stats import add_genre_plays
+from app.services.storage import FileNotFoundError as StorageFileNotFoundError
+from app.services.storage import (
+    FileTooLargeError,
+    StorageService,
+    UnsupportedFormatError,
+)
 
 
 @pytest.fixture
@@ -184,6 +103,18 @@ class TestStorageService:
         assert file_size == len(content)
         assert Path(file_path).exists()
 
+    async def test_save_audio_file_too_large(self, temp_upload_dir):
+        """Test oversized uploads are rejected and not left on disk."""
+        storage = StorageService(upload_dir=temp_upload_dir)
+        storage.max_size_bytes = 10
+        owner_id = uuid4()
+        file = io.BytesIO(b"more than ten bytes")
+
+        with pytest.raises(FileTooLargeError):
+            await storage.save_audio_file(file, owner_id, "test.mp3", "audio/mpeg")
+
+        assert not any((Path(temp_upload_dir) / "songs").rglob("*.mp3"))
+
     async def test_save_audio_file_unsupported_format(self, temp_upload_dir):
         """Test saving unsupported file format raises error."""
         storage = StorageService(upload_dir=temp_upload_dir)
@@ -228,6 +159,37 @@ class TestStorageService:
 
         assert result == b"234"
 
+    async def test_read_missing_file(self, temp_upload_dir):
+        """Test reading a missing file raises the storage error."""
+        storage = StorageService(upload_dir=temp_upload_dir)
+        file_path = str(Path(temp_upload_dir) / "missing.mp3")
+
+        with pytest.raises(StorageFileNotFoundError):
+            await storage.get_file_size(file_path)
+        with pytest.raises(StorageFileNotFoundError):
+            await storage.read_file(file_path)
+        with pytest.raises(StorageFileNotFoundError):
+            await storage.read_file_range(file_path, 0, 1)
+
+    async def test_iter_file_range(self, temp_upload_dir):
+        """Test reading a file range in bounded chunks."""
+        storage = StorageService(upload_dir=temp_upload_dir)
+
+        # Create a file
+        file_path = Path(temp_upload_dir) / "test.txt"
+        file_path.write_bytes(b"0123456789")
+
+        chunks = [
+            chunk
+            async for chunk in storage.iter_file_range(
+                str(file_path), 2, 9, chunk_size=3
+            )
+        ]
+        assert chunks == [b"234", b"567", b"8"]
+
+        chunks = [chunk async for chunk in storage.iter_file_range(str(file_path), 7)]
+        assert chunks == [b"789"]
+
 
 class TestMetadataExtractor:
     """Tests for MetadataExtractor."""
@@ -355,6 +317,26 @@ class TestMusicService:
         assert updated_song.title == "Updated Title"
         assert updated_song.artist == "Updated Artist"
 
+    async def test_update_song_genre_moves_plays(
+        self, db_session: AsyncSession, test_song: Song, test_user: User
+    ):
+        """Test changing a genre moves the song's plays to the new genre."""
+        db_session.add(ListeningHistory(user_id=test_user.id, song_id=test_song.id))
+        await db_session.flush()
+        await add_genre_plays(db_session, test_user.id, "Rock", 1)
+        music_service = MusicService(db_session)
+
+        await music_service.update_song(
+            test_song.id, test_user.id, SongUpdate(genre="Jazz")
+        )
+
+        result = await db_session.execute(
+            select(UserGenrePlays.genre, UserGenrePlays.play_count).where(
+                UserGenrePlays.user_id == test_user.id
+            )
+        )
+        assert dict(result.tuples().all()) == {"Rock": 0, "Jazz": 1}
+
     async def test_update_song_not_found(
         self, db_session: AsyncSession, test_user: User
     ):
@@ -386,6 +368,30 @@ class TestMusicService:
         song = await music_service.get_song_by_id(test_song.id, test_user.id)
         assert song is None
 
+    async def test_delete_song_removes_plays(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_user: User,
+        temp_upload_dir,
+    ):
+        """Test deleting a song takes its plays out of the genre counts."""
+        db_session.add(ListeningHistory(user_id=test_user.id, song_id=test_song.id))
+        await db_session.flush()
+        await add_genre_plays(db_session, test_user.id, "Rock", 1)
+        music_service = MusicService(
+            db_session, storage=StorageService(upload_dir=temp_upload_dir)
+        )
+
+        await music_service.delete_song(test_song.id, test_user.id)
+
+        result = await db_session.execute(
+            select(UserGenrePlays.play_count).where(
+                UserGenrePlays.user_id == test_user.id
+            )
+        )
+        assert result.scalar_one() == 0
+
     async def test_delete_song_not_found(
         self, db_session: AsyncSession, test_user: User
     ):
@@ -1,111 +1,28 @@
 """Tests for stats service and endpoints."""
 
-import os
 from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 import pytest
-from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-
-from app.core.security import create_access_token, get_password_hash
-from app.db.base import Base
-from app.db.session import get_db
-from app.main import app
-from app.models.listening_history import ContextType, ListeningHistory
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.listening_history import (
+    ContextType,
+    ListeningHistory,
+    UserGenrePlays,
+)
 from app.models.song import Song
 from app.models.user import User
+from app.schemas.song import SongResponse
 from app.schemas.stats import ContextType as SchemaContextType
-from app.schemas.stats import StatsPeriod
+from app.schemas.stats import PlayImportItem, StatsPeriod
 from app.services.cache import CacheService
 from app.services.stats import SongNotFoundError, StatsService
 
 
-def get_test_database_url() -> str:
-    """Get database URL for testing."""
-    pg_host = os.getenv("POSTGRES_HOST", "localhost")
-    pg_port = os.getenv("POSTGRES_PORT", "5432")
-    pg_user = os.getenv("POSTGRES_USER", "test")
-    pg_password = os.getenv("POSTGRES_PASSWORD", "test")
-    pg_db = os.getenv("POSTGRES_DB", "test")
-    return f"postgresql+asyncpg://{pg_user}:{pg_password}@{pg_host}:{pg_port}/{pg_db}"
-
-
-TEST_DATABASE_URL = get_test_database_url()
-
-
-@pytest.fixture
-async def db_session():
-    """Create a test database session."""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-    session_factory = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autoflush=False,
-    )
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    async with session_factory() as session:
-        yield session
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
-    await engine.dispose()
-
-
-@pytest.fixture
-async def client(db_session: AsyncSession):
-    """Create a test client with overridden database dependency."""
-
-    async def override_get_db():
-        try:
-            yield db_session
-            await db_session.commit()
-        except Exception:
-            await db_session.rollback()
-            raise
-
-    app.dependency_overrides[get_db] = override_get_db
-
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-    ) as ac:
-        yield ac
-
-    app.dependency_overrides.clear()
-
-
-@pytest.fixture
-async def test_user(db_session: AsyncSession) -> User:
-    """Create a test user."""
-    user = User(
-        email="test@example.com",
-        username="testuser",
-        password_hash=get_password_hash("SecurePass123"),
-    )
-    db_session.add(user)
-    await db_session.flush()
-    return user
-
-
-@pytest.fixture
-def auth_token(test_user: User) -> str:
-    """Create auth token for test user."""
-    return create_access_token(str(test_user.id))
-
-
-@pytest.fixture
-def auth_headers(auth_token: str) -> dict:
-    """Create auth headers."""
-    return {"Authorization": f"Bearer {auth_token}"}
-
-
 @pytest.fixture
 async def test_song(db_session: AsyncSession, test_user: User) -> Song:
     """Create a test song."""
@@ -151,12 +68,22 @@ async def test_songs(db_session: AsyncSession, test_user: User) -> list[Song]:
     return songs
 
 
+async def compute_without_cache(
+    key, factory, ttl_seconds, stale_ttl_seconds, field=None
+):
+    """Run the factory directly, as on a cache miss."""
+    return await factory()
+
+
 @pytest.fixture
 def mock_cache():
     """Create a mock cache service."""
     cache = MagicMock(spec=CacheService)
     cache.get = AsyncMock(return_value=None)
+    cache.get_or_set_swr = AsyncMock(side_effect=compute_without_cache)
     cache.set = AsyncMock(return_value=True)
+    cache.hget = AsyncMock(return_value=None)
+    cache.hset = AsyncMock(return_value=True)
     cache.delete = AsyncMock(return_value=True)
     cache.delete_pattern = AsyncMock(return_value=True)
     return cache
@@ -186,12 +113,14 @@ class TestStatsService:
         assert history.completed is True
         assert history.context_type == ContextType.LIBRARY
 
-        # Song play_count should be incremented
+        # Song play_count should be incremented in the database
+        await db_session.refresh(test_song)
         assert test_song.play_count == 1
         assert test_song.last_played_at is not None
 
-        # Cache should be invalidated
-        mock_cache.delete_pattern.assert_called_once()
+        # Stats and recommendation caches should be invalidated
+        mock_cache.delete.assert_called_once_with(f"stats:{test_user.id}")
+        mock_cache.delete_pattern.assert_any_call(f"recommendations:{test_user.id}:*")
 
     async def test_record_play_song_not_found(
         self, db_session: AsyncSession, test_user: User, mock_cache
@@ -206,6 +135,135 @@ class TestStatsService:
                 duration_listened_seconds=120,
             )
 
+    async def test_record_play_song_not_found_remembered(
+        self, db_session: AsyncSession, test_user: User, mock_cache
+    ):
+        """Test repeated plays of a missing song skip the database."""
+        stats_service = StatsService(db_session, cache=mock_cache)
+        song_id = uuid4()
+
+        with pytest.raises(SongNotFoundError):
+            await stats_service.record_play(
+                user_id=test_user.id,
+                song_id=song_id,
+                duration_listened_seconds=120,
+            )
+
+        with (
+            patch.object(db_session, "execute", wraps=db_session.execute) as execute,
+            pytest.raises(SongNotFoundError),
+        ):
+            await stats_service.record_play(
+                user_id=test_user.id,
+                song_id=song_id,
+                duration_listened_seconds=120,
+            )
+        execute.assert_not_called()
+
+    async def test_record_plays_bulk(
+        self,
+        db_session: AsyncSession,
+        test_songs: list[Song],
+        test_user: User,
+        mock_cache,
+    ):
+        """Test importing plays copies history and bumps play counts."""
+        stats_service = StatsService(db_session, cache=mock_cache)
+        now = datetime.now(UTC)
+        plays = [
+            PlayImportItem(
+                song_id=test_songs[0].id,
+                played_at=now - timedelta(days=days),
+                duration_listened_seconds=100,
+                context_type=SchemaContextType.PLAYLIST,
+            )
+            for days in (3, 1)
+        ]
+        plays.append(
+            PlayImportItem(
+                song_id=test_songs[1].id,
+                played_at=now - timedelta(days=2),
+                duration_listened_seconds=50,
+            )
+        )
+
+        recorded = await stats_service.record_plays_bulk(test_user.id, plays)
+
+        assert recorded == 3
+        history, total = await stats_service.get_history(user_id=test_user.id)
+        assert total == 3
+        assert history[0].song_id == test_songs[0].id
+        assert history[0].context_type == ContextType.PLAYLIST
+
+        for song in test_songs[:2]:
+            await db_session.refresh(song)
+        assert test_songs[0].play_count == 2
+        assert test_songs[0].last_played_at == now - timedelta(days=1)
+        assert test_songs[1].play_count == 1
+
+        result = await db_session.execute(
+            select(UserGenrePlays.genre, UserGenrePlays.play_count).where(
+                UserGenrePlays.user_id == test_user.id
+            )
+        )
+        assert dict(result.tuples().all()) == {"Rock": 2, "Pop": 1}
+        mock_cache.delete.assert_called_once_with(f"stats:{test_user.id}")
+
+    async def test_record_plays_bulk_mixed_naive_and_aware(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_user: User,
+        mock_cache,
+    ):
+        """Test naive import timestamps are read as UTC next to aware ones."""
+        stats_service = StatsService(db_session, cache=mock_cache)
+        latest = datetime(2024, 6, 2, 12, 0)
+        plays = [
+            PlayImportItem(
+                song_id=test_song.id,
+                played_at=datetime(2024, 6, 1, 12, 0, tzinfo=UTC),
+                duration_listened_seconds=100,
+            ),
+            PlayImportItem(
+                song_id=test_song.id,
+                played_at=latest.isoformat(),
+                duration_listened_seconds=100,
+            ),
+        ]
+        assert plays[1].played_at == latest.replace(tzinfo=UTC)
+
+        recorded = await stats_service.record_plays_bulk(test_user.id, plays)
+
+        assert recorded == 2
+        await db_session.refresh(test_song)
+        assert test_song.play_count == 2
+        assert test_song.last_played_at == latest.replace(tzinfo=UTC)
+
+    async def test_record_plays_bulk_song_not_found(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_user: User,
+        mock_cache,
+    ):
+        """Test an import with an unknown song records nothing."""
+        stats_service = StatsService(db_session, cache=mock_cache)
+        plays = [
+            PlayImportItem(
+                song_id=song_id,
+                played_at=datetime.now(UTC),
+                duration_listened_seconds=100,
+            )
+            for song_id in (test_song.id, uuid4())
+        ]
+
+        with pytest.raises(SongNotFoundError):
+            await stats_service.record_plays_bulk(test_user.id, plays)
+
+        _, total = await stats_service.get_history(user_id=test_user.id)
+        assert total == 0
+
     async def test_record_play_wrong_owner(
         self, db_session: AsyncSession, test_song: Song, mock_cache
     ):
@@ -287,6 +345,14 @@ class TestStatsService:
         assert len(history) == 2
         assert total == 5
 
+        # A page past the end still reports the total
+        history, total = await stats_service.get_history(
+            user_id=test_user.id, page=4, limit=2
+        )
+
+        assert len(history) == 0
+        assert total == 5
+
     async def test_get_history_date_filter(
         self, db_session: AsyncSession, test_song: Song, test_user: User, mock_cache
     ):
@@ -323,6 +389,19 @@ class TestStatsService:
         assert overview["unique_artists"] == 0
         assert overview["most_played_genre"] is None
 
+    async def test_get_overview_day_buckets_match_index(
+        self, db_session: AsyncSession, test_user: User, mock_cache, count_queries
+    ):
+        """Test the day buckets render the index expression's constants inline."""
+        stats_service = StatsService(db_session, cache=mock_cache)
+
+        with count_queries(db_session) as queries:
+            await stats_service.get_overview(user_id=test_user.id)
+
+        # Bound parameters would keep a generic plan from matching the index
+        day_bucket = "date_trunc('day', timezone('UTC', listening_history.played_at))"
+        assert any(day_bucket in query for query in queries)
+
     async def test_get_overview_with_data(
         self,
         db_session: AsyncSession,
@@ -355,6 +434,39 @@ class TestStatsService:
         assert overview["unique_songs"] == 3
         assert overview["unique_artists"] == 2  # Artist 0 and Artist 1
         assert overview["most_played_genre"] in ["Rock", "Pop"]
+        # All plays were just recorded, so every one is in the daily window
+        assert sum(h.count for h in overview["listening_by_hour"]) == 4
+        assert sum(d.count for d in overview["listening_by_day"]) == 4
+        for day in overview["listening_by_day"]:
+            datetime.strptime(day.day, "%Y-%m-%d")
+
+    async def test_get_overview_genre_from_rollup(
+        self,
+        db_session: AsyncSession,
+        test_songs: list[Song],
+        test_user: User,
+        mock_cache,
+    ):
+        """Test plays are counted per genre and the top genre is read back."""
+        stats_service = StatsService(db_session, cache=mock_cache)
+
+        # Rock, Pop, Rock, Rock
+        for song in [*test_songs[:3], test_songs[0]]:
+            await stats_service.record_play(
+                user_id=test_user.id,
+                song_id=song.id,
+                duration_listened_seconds=100,
+            )
+
+        result = await db_session.execute(
+            select(UserGenrePlays.genre, UserGenrePlays.play_count).where(
+                UserGenrePlays.user_id == test_user.id
+            )
+        )
+        assert dict(result.tuples().all()) == {"Rock": 3, "Pop": 1}
+
+        overview = await stats_service.get_overview(user_id=test_user.id)
+        assert overview["most_played_genre"] == "Rock"
 
     async def test_get_overview_with_period(
         self, db_session: AsyncSession, test_song: Song, test_user: User, mock_cache
@@ -415,6 +527,41 @@ class TestStatsService:
         assert top_songs[0]["song"].id == test_songs[0].id
         assert top_songs[1]["play_count"] == 1
 
+        # Plain column rows, still enough to render a SongResponse
+        assert not isinstance(top_songs[0]["song"], Song)
+        response = SongResponse.model_validate(top_songs[0]["song"])
+        assert response.title == test_songs[0].title
+
+    async def test_get_top_songs_cached(
+        self,
+        db_session: AsyncSession,
+        test_songs: list[Song],
+        test_user: User,
+        mock_cache,
+    ):
+        """Test top songs are cached and rebuilt from the cache."""
+        stats_service = StatsService(db_session, cache=mock_cache)
+        await stats_service.record_play(
+            user_id=test_user.id,
+            song_id=test_songs[0].id,
+            duration_listened_seconds=100,
+        )
+
+        await stats_service.get_top_songs(user_id=test_user.id, limit=2)
+
+        cache_key, cache_field, payload, _ = mock_cache.hset.call_args.args
+        assert cache_key == f"stats:{test_user.id}"
+        assert cache_field == "top_songs:all:2"
+
+        # Serve the cached payload
+        mock_cache.hget.return_value = payload
+        top_songs = await stats_service.get_top_songs(user_id=test_user.id, limit=2)
+
+        assert len(top_songs) == 1
+        assert top_songs[0]["song"].id == test_songs[0].id
+        assert top_songs[0]["song"].title == test_songs[0].title
+        assert top_songs[0]["play_count"] == 1
+
     async def test_get_top_artists_empty(
         self, db_session: AsyncSession, test_user: User, mock_cache
     ):
@@ -455,7 +602,14 @@ class TestStatsService:
         assert len(top_artists) == 2
         assert top_artists[0]["artist"] == "Artist 0"
         assert top_artists[0]["play_count"] == 3
-        assert len(top_artists[0]["songs"]) > 0
+        assert {s.title for s in top_artists[0]["songs"]} == {
+            "Song 0",
+            "Song 2",
+            "Song 4",
+        }
+        assert top_artists[1]["artist"] == "Artist 1"
+        assert top_artists[1]["play_count"] == 1
+        assert [s.title for s in top_artists[1]["songs"]] == ["Song 1"]
 
 
 class TestStatsEndpoints:
@@ -467,6 +621,7 @@ class TestStatsEndpoints:
         """Test POST /stats/play endpoint."""
         with patch("app.services.stats.get_cache_service") as mock_get_cache:
             mock_cache = MagicMock(spec=CacheService)
+            mock_cache.delete = AsyncMock(return_value=True)
             mock_cache.delete_pattern = AsyncMock(return_value=True)
             mock_get_cache.return_value = mock_cache
 
@@ -493,6 +648,7 @@ class TestStatsEndpoints:
         """Test POST /stats/play with non-existent song."""
         with patch("app.services.stats.get_cache_service") as mock_get_cache:
             mock_cache = MagicMock(spec=CacheService)
+            mock_cache.delete = AsyncMock(return_value=True)
             mock_cache.delete_pattern = AsyncMock(return_value=True)
             mock_get_cache.return_value = mock_cache
 
@@ -547,6 +703,7 @@ class TestStatsEndpoints:
         with patch("app.services.stats.get_cache_service") as mock_get_cache:
             mock_cache = MagicMock(spec=CacheService)
             mock_cache.get = AsyncMock(return_value=None)
+            mock_cache.get_or_set_swr = AsyncMock(side_effect=compute_without_cache)
             mock_cache.set = AsyncMock(return_value=True)
             mock_get_cache.return_value = mock_cache
 
@@ -566,6 +723,7 @@ class TestStatsEndpoints:
         with patch("app.services.stats.get_cache_service") as mock_get_cache:
             mock_cache = MagicMock(spec=CacheService)
             mock_cache.get = AsyncMock(return_value=None)
+            mock_cache.get_or_set_swr = AsyncMock(side_effect=compute_without_cache)
             mock_cache.set = AsyncMock(return_value=True)
             mock_get_cache.return_value = mock_cache
 
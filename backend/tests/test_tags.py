@@ -1,20 +1,18 @@
 """Tests for tags service and endpoints."""
 
-import os
+from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 import pytest
-from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from httpx import AsyncClient
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import create_access_token, get_password_hash
-from app.db.base import Base
-from app.db.session import get_db
-from app.main import app
 from app.models.song import Song
 from app.models.tag import Tag
 from app.models.user import User
 from app.schemas.tag import TagCreate, TagUpdate
+from app.services.cache import CacheService
 from app.services.tag import (
     SongNotFoundError,
     TagAlreadyExistsError,
@@ -25,90 +23,6 @@ from app.services.tag import (
 )
 
 
-def get_test_database_url() -> str:
-    """Get database URL for testing."""
-    pg_host = os.getenv("POSTGRES_HOST", "localhost")
-    pg_port = os.getenv("POSTGRES_PORT", "5432")
-    pg_user = os.getenv("POSTGRES_USER", "test")
-    pg_password = os.getenv("POSTGRES_PASSWORD", "test")
-    pg_db = os.getenv("POSTGRES_DB", "test")
-    return f"postgresql+asyncpg://{pg_user}:{pg_password}@{pg_host}:{pg_port}/{pg_db}"
-
-
-TEST_DATABASE_URL = get_test_database_url()
-
-
-@pytest.fixture
-async def db_session():
-    """Create a test database session."""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-    session_factory = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autoflush=False,
-    )
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    async with session_factory() as session:
-        yield session
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
-    await engine.dispose()
-
-
-@pytest.fixture
-async def client(db_session: AsyncSession):
-    """Create a test client with overridden database dependency."""
-
-    async def override_get_db():
-        try:
-            yield db_session
-            await db_session.commit()
-        except Exception:
-            await db_session.rollback()
-            raise
-
-    app.dependency_overrides[get_db] = override_get_db
-
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-    ) as ac:
-        yield ac
-
-    app.dependency_overrides.clear()
-
-
-@pytest.fixture
-async def test_user(db_session: AsyncSession) -> User:
-    """Create a test user."""
-    user = User(
-        email="test@example.com",
-        username="testuser",
-        password_hash=get_password_hash("SecurePass123"),
-    )
-    db_session.add(user)
-    await db_session.flush()
-    return user
-
-
-@pytest.fixture
-def auth_token(test_user: User) -> str:
-    """Create auth token for test user."""
-    return create_access_token(str(test_user.id))
-
-
-@pytest.fixture
-def auth_headers(auth_token: str) -> dict:
-    """Create auth headers."""
-    return {"Authorization": f"Bearer {auth_token}"}
-
-
 @pytest.fixture
 async def test_song(db_session: AsyncSession, test_user: User) -> Song:
     """Create a test song."""
@@ -157,6 +71,16 @@ async def test_tag2(db_session: AsyncSession, test_user: User) -> Tag:
     return tag
 
 
+@pytest.fixture
+def mock_cache():
+    """Create a mock cache service."""
+    cache = MagicMock(spec=CacheService)
+    cache.get = AsyncMock(return_value=None)
+    cache.set = AsyncMock(return_value=True)
+    cache.delete = AsyncMock(return_value=True)
+    return cache
+
+
 class TestTagService:
     """Tests for TagService."""
 
@@ -236,6 +160,48 @@ class TestTagService:
         assert tags[0].name == "Favorite"
         assert tags[1].name == "Rock"
 
+    async def test_get_tags_cached(
+        self,
+        db_session: AsyncSession,
+        test_tag: Tag,
+        test_user: User,
+        mock_cache,
+    ):
+        """Test tag lists are cached and served from the cache."""
+        service = TagService(db_session, cache=mock_cache)
+        tags = await service.get_tags(test_user.id)
+
+        mock_cache.set.assert_awaited_once()
+        cache_key, payload, _ = mock_cache.set.await_args.args
+        assert cache_key == f"tags:{test_user.id}"
+
+        mock_cache.get.return_value = payload
+        await db_session.delete(test_tag)
+        await db_session.flush()
+
+        cached_tags = await service.get_tags(test_user.id)
+
+        assert [(t.id, t.name, t.color, t.created_at) for t in cached_tags] == [
+            (t.id, t.name, t.color, t.created_at) for t in tags
+        ]
+
+    async def test_tag_mutations_invalidate_cache(
+        self, db_session: AsyncSession, test_user: User, mock_cache
+    ):
+        """Test creating, updating and deleting tags invalidate the tag list."""
+        service = TagService(db_session, cache=mock_cache)
+        cache_key = f"tags:{test_user.id}"
+
+        tag = await service.create_tag(test_user.id, TagCreate(name="Chill"))
+        await service.update_tag(tag.id, test_user.id, TagUpdate(color="#123456"))
+        await service.delete_tag(tag.id, test_user.id)
+
+        assert [call.args for call in mock_cache.delete.await_args_list] == [
+            (cache_key,),
+            (cache_key,),
+            (cache_key,),
+        ]
+
     async def test_update_tag(
         self, db_session: AsyncSession, test_tag: Tag, test_user: User
     ):
@@ -247,6 +213,36 @@ class TestTagService:
         assert tag.name == "Updated Rock"
         assert tag.color == "#0000FF"
 
+    async def test_update_tag_single_query(
+        self,
+        db_session: AsyncSession,
+        test_tag: Tag,
+        test_user: User,
+        count_queries,
+    ):
+        """Test renaming a tag checks the name and updates in one query."""
+        service = TagService(db_session)
+
+        with count_queries(db_session) as statements:
+            tag = await service.update_tag(
+                test_tag.id, test_user.id, TagUpdate(name="Metal")
+            )
+
+        assert tag.name == "Metal"
+        assert len(statements) == 1
+
+    async def test_update_tag_keeps_own_name(
+        self, db_session: AsyncSession, test_tag: Tag, test_user: User
+    ):
+        """Test updating a tag with its current name is not a conflict."""
+        service = TagService(db_session)
+        tag = await service.update_tag(
+            test_tag.id, test_user.id, TagUpdate(name=test_tag.name, color="#0000FF")
+        )
+
+        assert tag.name == test_tag.name
+        assert tag.color == "#0000FF"
+
     async def test_update_tag_not_found(
         self, db_session: AsyncSession, test_user: User
     ):
@@ -281,6 +277,28 @@ class TestTagService:
         tag = await service.get_tag_by_id(test_tag.id, test_user.id)
         assert tag is None
 
+    async def test_delete_tag_removes_it_from_songs(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_tag: Tag,
+        test_tag2: Tag,
+        test_user: User,
+    ):
+        """Test deleting a tag removes it from the songs it was on."""
+        service = TagService(db_session)
+        await service.add_tags_to_song(
+            test_song.id, [test_tag.id, test_tag2.id], test_user.id
+        )
+
+        await service.delete_tag(test_tag.id, test_user.id)
+
+        song = await service._get_song_with_tags(
+            test_song.id, test_user.id, refresh=True
+        )
+        assert song is not None
+        assert [st.tag_id for st in song.song_tags] == [test_tag2.id]
+
     async def test_delete_tag_not_found(
         self, db_session: AsyncSession, test_user: User
     ):
@@ -304,6 +322,94 @@ class TestTagService:
         assert len(song.song_tags) == 1
         assert song.song_tags[0].tag.id == test_tag.id
 
+    async def test_add_tag_to_second_song(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_tag: Tag,
+        test_user: User,
+    ):
+        """Test a tag loaded with one song can be added to another."""
+        other_song = Song(
+            owner_id=test_user.id,
+            title="Another Song",
+            duration_seconds=200,
+            file_path="/test/another.mp3",
+            file_size_bytes=1000000,
+            file_format="mp3",
+        )
+        db_session.add(other_song)
+        await db_session.flush()
+
+        service = TagService(db_session)
+        await service.add_tag_to_song(test_song.id, test_tag.id, test_user.id)
+        song = await service.add_tag_to_song(other_song.id, test_tag.id, test_user.id)
+        song = await service.remove_tag_from_song(
+            other_song.id, test_tag.id, test_user.id
+        )
+
+        assert song.song_tags == []
+
+    async def test_song_with_tags_raises_on_unloaded_relationships(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_tag: Tag,
+        test_user: User,
+    ):
+        """Test relationships outside the tag chain are not lazy loaded."""
+        service = TagService(db_session)
+        await service.add_tag_to_song(test_song.id, test_tag.id, test_user.id)
+        db_session.expunge_all()
+
+        song = await service.get_song_with_tags(test_song.id, test_user.id)
+
+        assert song is not None
+        assert song.song_tags[0].tag.name == test_tag.name
+        with pytest.raises(InvalidRequestError):
+            _ = song.owner
+
+    async def test_song_with_tags_query_count(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_tag: Tag,
+        test_tag2: Tag,
+        test_user: User,
+        count_queries,
+    ):
+        """Test song, associations and tags load in three queries."""
+        service = TagService(db_session)
+        await service.add_tags_to_song(
+            test_song.id, [test_tag.id, test_tag2.id], test_user.id
+        )
+        db_session.expunge_all()
+
+        with count_queries(db_session) as statements:
+            song = await service.get_song_with_tags(test_song.id, test_user.id)
+
+        assert song is not None
+        assert len(song.song_tags) == 2
+        assert len(statements) == 3
+
+    async def test_add_tag_to_song_query_count(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_tag: Tag,
+        test_user: User,
+        count_queries,
+    ):
+        """Test the song and the tag are validated in the same query."""
+        service = TagService(db_session)
+
+        with count_queries(db_session) as statements:
+            await service.add_tag_to_song(test_song.id, test_tag.id, test_user.id)
+
+        # Song with the tag, its (empty) associations, then the insert
+        assert len(statements) == 3
+        assert statements[-1].startswith("INSERT INTO song_tags")
+
     async def test_add_tag_to_song_already_exists(
         self,
         db_session: AsyncSession,
@@ -352,6 +458,8 @@ class TestTagService:
         )
 
         assert len(song.song_tags) == 0
+        _, total = await service.get_songs_by_tag(test_tag.id, test_user.id)
+        assert total == 0
 
     async def test_remove_tag_from_song_not_on_song(
         self,
@@ -366,6 +474,146 @@ class TestTagService:
         with pytest.raises(TagNotOnSongError):
             await service.remove_tag_from_song(test_song.id, test_tag.id, test_user.id)
 
+    async def test_add_tags_to_song(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_tag: Tag,
+        test_tag2: Tag,
+        test_user: User,
+    ):
+        """Test adding several tags to song skips those already on it."""
+        service = TagService(db_session)
+        await service.add_tag_to_song(test_song.id, test_tag.id, test_user.id)
+
+        song = await service.add_tags_to_song(
+            test_song.id, [test_tag.id, test_tag2.id], test_user.id
+        )
+
+        assert {st.tag.id for st in song.song_tags} == {test_tag.id, test_tag2.id}
+
+    async def test_add_tags_to_song_inserts_in_one_statement(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_tag: Tag,
+        test_tag2: Tag,
+        test_user: User,
+        count_queries,
+    ):
+        """Test new associations are written by a single multi-row INSERT."""
+        service = TagService(db_session)
+
+        with count_queries(db_session) as statements:
+            await service.add_tags_to_song(
+                test_song.id, [test_tag.id, test_tag2.id], test_user.id
+            )
+
+        inserts = [s for s in statements if s.startswith("INSERT INTO song_tags")]
+        assert len(inserts) == 1
+        assert inserts[0].count("), (") == 1
+
+    async def test_add_tags_to_song_tag_not_found(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_tag: Tag,
+        test_user: User,
+    ):
+        """Test adding several tags fails when any tag is unknown."""
+        service = TagService(db_session)
+
+        with pytest.raises(TagNotFoundError):
+            await service.add_tags_to_song(
+                test_song.id, [test_tag.id, uuid4()], test_user.id
+            )
+
+    async def test_remove_tags_from_song(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_tag: Tag,
+        test_tag2: Tag,
+        test_user: User,
+    ):
+        """Test removing several tags from song ignores those not on it."""
+        service = TagService(db_session)
+        await service.add_tags_to_song(
+            test_song.id, [test_tag.id, test_tag2.id], test_user.id
+        )
+
+        song = await service.remove_tags_from_song(
+            test_song.id, [test_tag.id, uuid4()], test_user.id
+        )
+
+        assert [st.tag.id for st in song.song_tags] == [test_tag2.id]
+
+    async def test_get_songs_by_tag_paginates_with_total(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_tag: Tag,
+        test_user: User,
+    ):
+        """Test songs by tag returns the requested page and the full total."""
+        other_song = Song(
+            owner_id=test_user.id,
+            title="Another Song",
+            artist="Test Artist",
+            duration_seconds=200,
+            file_path="/test/another.mp3",
+            file_size_bytes=1000000,
+            file_format="mp3",
+        )
+        db_session.add(other_song)
+        await db_session.flush()
+
+        service = TagService(db_session)
+        await service.add_tag_to_song(test_song.id, test_tag.id, test_user.id)
+        await service.add_tag_to_song(other_song.id, test_tag.id, test_user.id)
+
+        songs, total = await service.get_songs_by_tag(
+            test_tag.id, test_user.id, page=1, limit=1
+        )
+
+        assert total == 2
+        assert [song.id for song in songs] == [other_song.id]
+
+        songs, total = await service.get_songs_by_tag(
+            test_tag.id, test_user.id, page=3, limit=1
+        )
+
+        assert total == 2
+        assert songs == []
+
+    async def test_get_songs_by_tag_query_count(
+        self,
+        db_session: AsyncSession,
+        test_song: Song,
+        test_tag: Tag,
+        test_user: User,
+        count_queries,
+    ):
+        """Test a non-empty page and its total take a single query."""
+        service = TagService(db_session)
+        await service.add_tag_to_song(test_song.id, test_tag.id, test_user.id)
+
+        with count_queries(db_session) as statements:
+            songs, total = await service.get_songs_by_tag(test_tag.id, test_user.id)
+
+        assert total == 1
+        assert len(songs) == 1
+        assert len(statements) == 1
+
+    async def test_get_songs_by_tag_not_found(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """Test songs by non-existent tag."""
+        service = TagService(db_session)
+
+        with pytest.raises(TagNotFoundError):
+            await service.get_songs_by_tag(uuid4(), test_user.id)
+
 
 class TestTagsEndpoints:
     """Tests for tags API endpoints."""
@@ -610,3 +858,30 @@ class TestSongTagsEndpoints:
         assert len(data["tags"]) == 2
         tag_names = {t["name"] for t in data["tags"]}
         assert tag_names == {"Rock", "Favorite"}
+
+    async def test_batch_add_and_remove_tags(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        test_song: Song,
+        test_tag: Tag,
+        test_tag2: Tag,
+    ):
+        """Test adding and removing several tags in one request each."""
+        response = await client.post(
+            f"/api/v1/songs/{test_song.id}/tags/batch",
+            headers=auth_headers,
+            json={"tag_ids": [str(test_tag.id), str(test_tag2.id)]},
+        )
+
+        assert response.status_code == 200
+        assert len(response.json()["tags"]) == 2
+
+        response = await client.delete(
+            f"/api/v1/songs/{test_song.id}/tags",
+            headers=auth_headers,
+            params={"tag_ids": [str(test_tag.id), str(test_tag2.id)]},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["tags"] == []